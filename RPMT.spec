@@ -10,7 +10,8 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Migrations only run through the flask command line, keep them out of the exe
+    excludes=['flask_migrate', 'alembic', 'mako'],
     noarchive=False,
     optimize=0,
 )
@@ -26,7 +27,8 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    # UPX compressed binaries have to be decompressed on every launch, which slows startup
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=True,
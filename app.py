@@ -1,11 +1,9 @@
-from rpmt import app
-from waitress import serve
-import webbrowser
-import threading
-
-def open_browser():
-    webbrowser.open_new('http://127.0.0.1:8080')  # Replace with your desired address
+import multiprocessing
 
+# Server settings (threads, workers, port, ...) come from the environment, see rpmt/server.py
+# The password hashing processes import this file too, rpmt is only imported by the server itself
 if __name__ == '__main__':
-    threading.Timer(1, open_browser).start()  # Open browser after 1 second
-    serve(app, host="0.0.0.0", port=8080)
\ No newline at end of file
+    # Lets the password hashing processes start from RPMT.exe
+    multiprocessing.freeze_support()
+    from rpmt.server import serve
+    serve()
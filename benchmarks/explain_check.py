@@ -0,0 +1,71 @@
+from seed import app, db, seed
+from rpmt.models import Project, Author, AuthorProject, EditorProject
+from sqlalchemy import delete, exists, text
+from datetime import date
+import sys
+
+# Query Plan Check
+# ----------------------------------------------------------------------------------------------
+# Runs EXPLAIN on the hot queries against a seeded database and exits with an error if any of them
+# falls back to a sequential scan of a table that should be reached through an index.
+# Usage: python benchmarks/explain_check.py [N_PROJECTS]
+def hot_queries():
+    return {
+        # Keyset pages of the project lists
+        "project list page": (
+            Project.query.with_entities(Project.id, Project.title)
+                   .filter(db.tuple_(Project.date_published, Project.id) < (date(2010, 1, 1), 500))
+                   .order_by(Project.date_published.desc(), Project.id.desc()).limit(26),
+            ["project"]
+        ),
+        "faculty project list": (
+            Project.query.with_entities(Project.id, Project.title).filter_by(creator_id=1),
+            ["project"]
+        ),
+        # Author/editor links of one project (project page, edit form, link diff)
+        "project authors": (AuthorProject.query.filter_by(project_id=1), ["author_project"]),
+        "project editors": (EditorProject.query.filter_by(project_id=1), ["editor_project"]),
+        # Projects of one author
+        "author projects": (AuthorProject.query.filter_by(author_id=1), ["author_project"]),
+        # Name resolution when saving projects
+        "resolve names": (Author.query.filter(db.func.lower(Author.name).in_(["author 1", "author 2"])), ["author"]),
+        "inserted names": (Author.query.filter(Author.name.in_(["Author 1", "Author 2"])), ["author"]),
+        # Orphan sweep: scanning author is expected, the link lookups are not
+        "orphan sweep": (
+            delete(Author).where(~exists().where(AuthorProject.author_id == Author.id)),
+            ["author_project"]
+        ),
+    }
+
+def compile_query(query):
+    statement = getattr(query, "statement", query)
+    return str(statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+
+def sequential_scans(sql):
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text("SET enable_seqscan = off"))
+        plan = [row[0] for row in db.session.execute(text("EXPLAIN " + sql))]
+        db.session.rollback()
+        return plan, [line.split("Seq Scan on ")[1].split()[0] for line in plan if "Seq Scan on " in line]
+    plan = [row[3] for row in db.session.execute(text("EXPLAIN QUERY PLAN " + sql))]
+    db.session.rollback()
+    return plan, [line.split()[1] for line in plan if line.startswith("SCAN ") and " USING " not in line]
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    failures = 0
+    with app.app_context():
+        seed(size)
+        if db.engine.dialect.name == 'sqlite':
+            db.session.execute(text("ANALYZE"))
+            db.session.commit()
+        for name, (query, indexed_tables) in hot_queries().items():
+            plan, scanned = sequential_scans(compile_query(query))
+            bad = [table for table in scanned if table in indexed_tables]
+            status = "FAIL" if bad else "ok"
+            failures += bool(bad)
+            print(f"{status:>4}  {name}")
+            if bad:
+                for line in plan:
+                    print(f"      {line}")
+    sys.exit(1 if failures else 0)
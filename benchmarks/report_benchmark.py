@@ -0,0 +1,40 @@
+from seed import app, db, seed, QueryCounter
+from rpmt.models import Project, Author, Editor, AuthorProject, EditorProject
+from rpmt.reports import get_report_rows
+import time
+import sys
+
+# Report Benchmark
+# ----------------------------------------------------------------------------------------------
+# Compares the old per-project author/editor lookups with the single aggregated report query.
+# Usage: python benchmarks/report_benchmark.py [N_PROJECTS ...]
+# The per-project method is skipped above PER_PROJECT_LIMIT since it takes minutes at that size.
+PER_PROJECT_LIMIT = 10000
+
+def per_project_report():
+    rows = []
+    for project in Project.query.all():
+        author_names = [author.name for author in Author.query.join(AuthorProject).filter(AuthorProject.project_id == project.id).all()]
+        editor_names = [editor.name for editor in Editor.query.join(EditorProject).filter(EditorProject.project_id == project.id).all()]
+        rows.append((project.title, ", ".join(author_names), ", ".join(editor_names)))
+    return rows
+
+def measure(report):
+    db.session.expire_all()
+    with QueryCounter() as counter:
+        start = time.perf_counter()
+        rows = report()
+        elapsed = time.perf_counter() - start
+    return len(rows), counter.count, elapsed
+
+if __name__ == '__main__':
+    sizes = [int(size) for size in sys.argv[1:]] or [1000, 10000, 50000]
+    print(f"{'projects':>10} {'method':>12} {'rows':>8} {'queries':>8} {'seconds':>9}")
+    with app.app_context():
+        for size in sizes:
+            seed(size)
+            for name, report in [("per-project", per_project_report), ("aggregated", get_report_rows)]:
+                if report is per_project_report and size > PER_PROJECT_LIMIT:
+                    continue
+                rows, queries, elapsed = measure(report)
+                print(f"{size:>10} {name:>12} {rows:>8} {queries:>8} {elapsed:>9.3f}")
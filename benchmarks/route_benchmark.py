@@ -0,0 +1,209 @@
+from storage_stub import StorageStub
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from io import BytesIO
+import statistics
+import argparse
+import random
+import json
+import math
+import time
+import sys
+import os
+import re
+
+# Route Benchmark
+# ----------------------------------------------------------------------------------------------
+# Seeds a synthetic database (see seed.py) and drives the real routes through the Flask test client
+# as a logged in admin, with attachments going to a local Supabase storage stand-in.
+# Every scenario reports p50/p95/p99 latency, throughput and SQL queries per request, the query
+# count is read from the Server-Timing header rpmt/metrics.py adds to every response.
+# The result is compared with benchmarks/baselines/routes.json, --save overwrites that baseline.
+# Latencies depend on the machine, compare runs made on the same one.
+# Usage: python benchmarks/route_benchmark.py [--projects N] [--requests N] [--threads N]
+#                                             [--latency MS] [--only SCENARIO ...] [--save]
+BASELINE_PATH = Path(__file__).resolve().parent / 'baselines' / 'routes.json'
+WARMUP_REQUESTS = 5
+# A scenario counts as regressed when its p95 grows by this factor or it runs more queries
+REGRESSION_FACTOR = 1.25
+QUERIES_PATTERN = re.compile(r'desc="(\d+) queries"')
+PDF_SIZE = 256 * 1024
+
+args = argparse.ArgumentParser(description="Benchmark the RPMT routes against a synthetic database.")
+args.add_argument("--projects", type=int, default=5000)
+args.add_argument("--requests", type=int, default=200, help="requests per scenario")
+args.add_argument("--threads", type=int, default=1, help="concurrent clients per scenario")
+args.add_argument("--latency", type=float, default=0, help="added storage latency in milliseconds")
+args.add_argument("--only", nargs="*", help="scenarios to run")
+args.add_argument("--save", action="store_true")
+args = args.parse_args()
+
+# The stand-in has to be running before rpmt reads SUPABASE_URL on import
+storage_stub = StorageStub(latency=args.latency / 1000).start()
+os.environ["SUPABASE_URL"] = storage_stub.url
+os.environ["SUPABASE_KEY"] = "benchmark.benchmark.benchmark"
+
+from seed import app, db, seed, TOPICS
+from rpmt.search import rebuild_search_index
+from rpmt.reports import report_cache
+
+app.config['WTF_CSRF_ENABLED'] = False
+
+# Scenarios
+# ----------------------------------------------------------------------------------------------
+# Each scenario takes (client, rng, request number) and makes one request
+# Saving a project redirects back to the admin page, a 200 there means the form was rejected
+def project_form(rng, number):
+    return {
+        "title": f"Benchmark project {number} on {' '.join(rng.sample(TOPICS, 3))}",
+        "abstract": "Benchmark abstract",
+        "authors": ", ".join(f"Author {rng.randint(1, args.projects // 5)}" for _ in range(rng.randint(1, 5))),
+        "type": "Journal Article",
+        "date_published": date(2000 + rng.randrange(25), rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+        "publication_name": "Journal",
+        "publisher": "Publisher",
+        "publisher_type": "Academic",
+        "publisher_location": "Philippines",
+        "editors": f"Editor {rng.randint(1, max(5, args.projects // 50))}",
+        "vol_issue_no": "1",
+        "doi_url": f"10.9999/benchmark-{number}-{rng.random()}",
+        "isbn_issn": "ISSN",
+        "other_database": "",
+        "citations": str(rng.randrange(100))
+    }
+
+def report_dates(rng):
+    start_year = 2000 + rng.randrange(20)
+    return {"start_date": f"{start_year}-01-01", "end_date": f"{start_year + rng.randint(1, 5)}-12-31"}
+
+def project_list(client, rng, number):
+    return client.get("/projects/")
+
+def project_page(client, rng, number):
+    return client.get(f"/projects/{rng.randint(1, args.projects)}")
+
+def search_title(client, rng, number):
+    return client.post("/projects/", data={"title": rng.choice(TOPICS)})
+
+def search_author(client, rng, number):
+    return client.post("/projects/", data={"author": f"Author {rng.randint(1, 50)}"})
+
+def report(client, rng, number):
+    return client.post("/admin/report", data=report_dates(rng))
+
+def report_uncached(client, rng, number):
+    report_cache.clear()
+    return client.post("/admin/report", data=report_dates(rng))
+
+def add_project(client, rng, number):
+    data = project_form(rng, number)
+    data["pdf"] = (BytesIO(os.urandom(PDF_SIZE)), "benchmark.pdf")
+    return client.post("/admin/add", data=data, content_type="multipart/form-data")
+
+def edit_project(client, rng, number):
+    return client.post(f"/admin/edit/{rng.randint(1, args.projects)}", data=project_form(rng, number))
+
+SCENARIOS = {
+    "project_list": (project_list, 200),
+    "project_page": (project_page, 200),
+    "search_title": (search_title, 200),
+    "search_author": (search_author, 200),
+    "report": (report, 200),
+    "report_uncached": (report_uncached, 200),
+    "add_project": (add_project, 302),
+    "edit_project": (edit_project, 302)
+}
+
+# Running
+# ----------------------------------------------------------------------------------------------
+def login(client):
+    with client.session_transaction() as session:
+        session["_user_id"] = "1"
+        session["_fresh"] = True
+
+# Nearest rank percentile of sorted values
+def percentile(values, percent):
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+def run_client(scenario, expected_status, client_number, numbers):
+    rng = random.Random(f"{scenario.__name__}-{client_number}")
+    client = app.test_client()
+    login(client)
+    samples = []
+    for number in numbers:
+        start = time.perf_counter()
+        response = scenario(client, rng, number)
+        elapsed = time.perf_counter() - start
+        match = QUERIES_PATTERN.search(response.headers.get("Server-Timing", ""))
+        samples.append((elapsed, int(match.group(1)) if match else 0, response.status_code == expected_status))
+    return samples
+
+def run_scenario(scenario, expected_status):
+    run_client(scenario, expected_status, -1, range(-WARMUP_REQUESTS, 0))
+    threads = min(args.threads, args.requests)
+    batches = [range(start, args.requests, threads) for start in range(threads)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(run_client, [scenario] * threads, [expected_status] * threads,
+                                     range(threads), batches))
+    wall = time.perf_counter() - start
+
+    samples = [sample for result in results for sample in result]
+    latencies = sorted(elapsed * 1000 for elapsed, _, _ in samples)
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, _, ok in samples if not ok),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "per_second": round(len(samples) / wall, 1),
+        "queries": statistics.median(queries for _, queries, _ in samples)
+    }
+
+def format_change(current, previous):
+    if previous is None:
+        return ""
+    return f"{current - previous:+9.1f}"
+
+def is_regression(result, previous):
+    return previous is not None and (result["p95_ms"] > previous["p95_ms"] * REGRESSION_FACTOR
+                                     or result["queries"] > previous["queries"])
+
+if __name__ == '__main__':
+    with app.app_context():
+        seed(args.projects)
+        rebuild_search_index()
+        config = {"projects": args.projects, "requests": args.requests, "threads": args.threads,
+                  "latency_ms": args.latency, "database": db.engine.dialect.name}
+    names = args.only or list(SCENARIOS)
+
+    baseline = None
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text())
+        if baseline["config"] != config:
+            print(f"The baseline was made with {baseline['config']}, not comparing\n")
+            baseline = None
+
+    results = {}
+    regressed = []
+    print(f"{'scenario':>16} {'reqs':>5} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} "
+          f"{'queries':>7} {'vs base p50':>11} {'p95':>9} {'queries':>9}")
+    for name in names:
+        result = results[name] = run_scenario(*SCENARIOS[name])
+        previous = baseline["scenarios"].get(name) if baseline else None
+        changes = "".join(format_change(result[key], previous[key]) if previous else ""
+                          for key in ["p50_ms", "p95_ms", "queries"])
+        if is_regression(result, previous):
+            regressed.append(name)
+        print(f"{name:>16} {result['requests']:>5} {result['errors']:>6} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+              f"{result['p99_ms']:>8.1f} {result['per_second']:>8.1f} {result['queries']:>7g}   {changes}")
+    storage_stub.stop()
+
+    if regressed:
+        print(f"\nRegressed: {', '.join(regressed)}")
+    if args.save:
+        BASELINE_PATH.parent.mkdir(exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps({"config": config, "scenarios": results}, indent=2) + "\n")
+        print(f"\nSaved baseline to {BASELINE_PATH}")
+    sys.exit(1 if regressed else 0)
@@ -0,0 +1,124 @@
+import os
+import sys
+import random
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+# Benchmark Setup
+# ----------------------------------------------------------------------------------------------
+# Benchmarks run against a throwaway local SQLite database unless DATABASE_URI is already set,
+# and never need real Supabase credentials.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URI", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3"))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+from rpmt import app, db
+from rpmt import search
+from rpmt.models import User, Project, Author, Editor, AuthorProject, EditorProject
+from sqlalchemy import insert, event, text
+from itertools import accumulate
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(db.engine, "before_cursor_execute", self.increment)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(db.engine, "before_cursor_execute", self.increment)
+
+    def increment(self, *args):
+        self.count += 1
+
+def reset_database():
+    # The search index table is created outside the models, drop it so the next search rebuilds it
+    db.session.execute(text("DROP TABLE IF EXISTS project_search"))
+    db.session.commit()
+    search.index_ready = False
+    db.drop_all()
+    db.create_all()
+
+# Synthetic Data
+# ----------------------------------------------------------------------------------------------
+# Co-authorship follows the shape of real publication data: a few authors write most of the papers
+# (Zipf distributed productivity), most papers have 2 to 5 authors with a long tail of bigger teams,
+# and co-authors usually come from the lead author's research group.
+TEAM_SIZES = [1, 2, 3, 4, 5, 6, 7, 8, 10, 12]
+TEAM_SIZE_WEIGHTS = [12, 20, 24, 18, 11, 6, 4, 2, 2, 1]
+ZIPF_EXPONENT = 0.9
+GROUP_SIZE = 12
+IN_GROUP_SHARE = 0.75
+TOPICS = [
+    "queueing", "scheduling", "inventory", "logistics", "optimization", "simulation", "forecasting",
+    "supply", "chain", "network", "routing", "vehicle", "warehouse", "demand", "stochastic", "model",
+    "analysis", "healthcare", "manufacturing", "quality", "reliability", "energy", "transport", "policy",
+    "learning", "heuristic", "multi-objective", "risk", "capacity", "planning", "production", "service"
+]
+
+def zipf_weights(n):
+    return list(accumulate(1 / rank ** ZIPF_EXPONENT for rank in range(1, n + 1)))
+
+def pick_authors(rng, n_authors, author_weights, team_size):
+    team_size = min(team_size, n_authors)
+    lead = rng.choices(range(1, n_authors + 1), cum_weights=author_weights)[0]
+    group_start = (lead - 1) // GROUP_SIZE * GROUP_SIZE + 1
+    group = range(group_start, min(group_start + GROUP_SIZE, n_authors + 1))
+    team = {lead}
+    while len(team) < team_size:
+        if rng.random() < IN_GROUP_SHARE and len(team) < len(group):
+            team.add(rng.choice(group))
+        else:
+            team.add(rng.choices(range(1, n_authors + 1), cum_weights=author_weights)[0])
+    return team
+
+# Function to fill the database with n_projects synthetic publications
+# authors_per_project fixes the team size, by default it follows TEAM_SIZE_WEIGHTS
+def seed(n_projects, n_users=10, n_authors=None, n_editors=None, authors_per_project=None, seed_value=195):
+    rng = random.Random(seed_value)
+    n_authors = n_authors or max(10, n_projects // 5)
+    n_editors = n_editors or max(5, n_projects // 50)
+    author_weights = zipf_weights(n_authors)
+    editor_weights = zipf_weights(n_editors)
+
+    reset_database()
+    db.session.execute(insert(User), [{
+        "id": i, "username": f"benchmark{i}", "email": f"benchmark{i}@rpmt.local",
+        "password": "benchmark", "role": "Admin" if i == 1 else "Faculty"
+    } for i in range(1, n_users + 1)])
+    db.session.execute(insert(Author), [{"id": i, "name": f"Author {i}"} for i in range(1, n_authors + 1)])
+    db.session.execute(insert(Editor), [{"id": i, "name": f"Editor {i}"} for i in range(1, n_editors + 1)])
+
+    projects = []
+    author_links = []
+    editor_links = []
+    first_date = date(2000, 1, 1)
+    for project_id in range(1, n_projects + 1):
+        projects.append({
+            "id": project_id, "creator_id": rng.randrange(1, n_users + 1),
+            "title": f"Project {project_id} on {' '.join(rng.sample(TOPICS, rng.randint(2, 5)))}",
+            "abstract": "Synthetic abstract " * 20,
+            "type": "Journal Article",
+            "date_published": first_date + timedelta(days=rng.randrange(9000)),
+            "publication_name": "Journal", "publisher": "Publisher", "publisher_type": "Academic",
+            "publisher_location": "Philippines", "vol_issue_no": "1", "doi_url": f"10.0000/{project_id}",
+            "isbn_issn": "ISSN", "web_of_science": rng.random() < 0.3, "elsevier_scopus": rng.random() < 0.5,
+            "elsevier_sciencedirect": rng.random() < 0.2, "pubmed_medline": rng.random() < 0.1,
+            "ched_recognized": rng.random() < 0.6, "other_database": "", "citations": rng.randrange(100),
+            "publication_proof": "none.png", "utilization_proof": "none.png", "pdf": "none.pdf"
+        })
+        team_size = authors_per_project or rng.choices(TEAM_SIZES, weights=TEAM_SIZE_WEIGHTS)[0]
+        for author_id in pick_authors(rng, n_authors, author_weights, team_size):
+            author_links.append({"author_id": author_id, "project_id": project_id})
+        editor_id = rng.choices(range(1, n_editors + 1), cum_weights=editor_weights)[0]
+        editor_links.append({"editor_id": editor_id, "project_id": project_id})
+
+    db.session.execute(insert(Project), projects)
+    db.session.execute(insert(AuthorProject), author_links)
+    db.session.execute(insert(EditorProject), editor_links)
+    db.session.commit()
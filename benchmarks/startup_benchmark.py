@@ -0,0 +1,93 @@
+from pathlib import Path
+import subprocess
+import statistics
+import tempfile
+import json
+import time
+import sys
+import os
+
+# Startup Benchmark
+# ----------------------------------------------------------------------------------------------
+# Imports app.py in fresh interpreters with python -X importtime and reports the median wall time
+# and import time, plus the import time spent in each top level package.
+# The result is compared with benchmarks/baselines/startup.json, --save overwrites that baseline.
+# Usage: python benchmarks/startup_benchmark.py [RUNS] [--save]
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / 'baselines' / 'startup.json'
+TOP_PACKAGES = 15
+
+def get_env():
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URI", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3"))
+    env.setdefault("SECRET_KEY", "benchmark")
+    env.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+    env.setdefault("SUPABASE_KEY", "benchmark")
+    # Don't let a stray flask CLI flag turn on the CLI only setup
+    env.pop("FLASK_RUN_FROM_CLI", None)
+    return env
+
+# Returns (wall seconds, package -> import microseconds) for one cold import of app.py
+def measure(env):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - start
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, name = line.split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_time.split(":")[1])
+    return wall, packages
+
+def run(runs):
+    env = get_env()
+    walls = []
+    samples = []
+    for _ in range(runs):
+        wall, packages = measure(env)
+        walls.append(wall)
+        samples.append(packages)
+    names = set().union(*samples)
+    packages = {name: statistics.median(sample.get(name, 0) for sample in samples) / 1000 for name in names}
+    return {
+        "wall_ms": round(statistics.median(walls) * 1000, 1),
+        "import_ms": round(statistics.median(sum(sample.values()) for sample in samples) / 1000, 1),
+        "packages": {name: round(ms, 1) for name, ms in sorted(packages.items(), key=lambda item: -item[1])}
+    }
+
+def format_change(current, previous):
+    if previous is None:
+        return ""
+    return f"{current - previous:+9.1f}"
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if arg != "--save"]
+    runs = int(args[0]) if args else 5
+    result = run(runs)
+
+    baseline = None
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text())
+
+    print(f"{'':>22} {'ms':>9} {'vs base':>9}")
+    for key in ["wall_ms", "import_ms"]:
+        previous = baseline[key] if baseline else None
+        print(f"{key:>22} {result[key]:>9.1f} {format_change(result[key], previous)}")
+    print()
+    for name, ms in list(result["packages"].items())[:TOP_PACKAGES]:
+        previous = baseline["packages"].get(name, 0) if baseline else None
+        print(f"{name:>22} {ms:>9.1f} {format_change(ms, previous)}")
+    if baseline:
+        dropped = [name for name in baseline["packages"] if name not in result["packages"]]
+        if dropped:
+            print(f"\nNo longer imported: {', '.join(sorted(dropped))}")
+
+    if "--save" in sys.argv:
+        BASELINE_PATH.parent.mkdir(exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"\nSaved baseline to {BASELINE_PATH}")
@@ -0,0 +1,93 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, unquote
+import threading
+import json
+import time
+
+# Supabase Storage Stand-in
+# ----------------------------------------------------------------------------------------------
+# A local HTTP server answering the storage API calls RPMT makes (upload, remove, public and signed
+# URLs), so benchmarks exercise the real Supabase client without credentials or network.
+# Files are kept in memory, latency adds a fixed delay to every call to mimic a remote bucket.
+# Usage: server = StorageStub(latency=0.02).start(); SUPABASE_URL = server.url
+OBJECT_PREFIX = "/storage/v1/object/"
+
+class StorageStub:
+    def __init__(self, latency=0, bucket="RPMT"):
+        self.latency = latency
+        self.bucket = bucket
+        self.files = {}
+        self.lock = threading.Lock()
+        self.server = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def read_body(self):
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def object_path(self):
+                path = unquote(urlparse(self.path).path)
+                return path[len(OBJECT_PREFIX):] if path.startswith(OBJECT_PREFIX) else None
+
+            def do_POST(self):
+                time.sleep(stub.latency)
+                path = self.object_path()
+                body = self.read_body()
+                if path is None:
+                    return self.send_json(404, {"error": "Not found"})
+                if path.startswith("sign/"):
+                    return self.send_json(200, {"signedURL": f"/object/{path}?token=benchmark"})
+                # Uploads arrive as multipart form data, only the size matters here
+                with stub.lock:
+                    stub.files[path] = len(body)
+                self.send_json(200, {"Key": path})
+
+            do_PUT = do_POST
+
+            def do_DELETE(self):
+                time.sleep(stub.latency)
+                path = self.object_path()
+                prefixes = json.loads(self.read_body() or b"{}").get("prefixes", [])
+                removed = []
+                with stub.lock:
+                    for prefix in prefixes:
+                        if stub.files.pop(f"{path}/{prefix}", None) is not None:
+                            removed.append({"name": prefix})
+                self.send_json(200, removed)
+
+            def do_HEAD(self):
+                time.sleep(stub.latency)
+                path = self.object_path() or ""
+                exists = path.startswith("public/") and path[len("public/"):] in stub.files
+                self.send_response(200 if exists else 404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self):
+                self.do_HEAD()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
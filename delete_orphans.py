@@ -0,0 +1,11 @@
+from rpmt import app
+from rpmt.names import delete_orphan_names
+
+def delete_orphans():
+    with app.app_context():
+        # Remove authors and editors that are no longer linked to any project
+        deleted_authors, deleted_editors = delete_orphan_names()
+        print(f"Deleted {deleted_authors} authors and {deleted_editors} editors without projects.")
+
+if __name__ == '__main__':
+    delete_orphans()
@@ -1,5 +1,6 @@
 from rpmt import app, db
 from rpmt.models import User
+from rpmt.user_cache import user_cache
 import sys
 
 def delete_user(username):
@@ -8,8 +9,11 @@ def delete_user(username):
         user = User.query.filter_by(username=username).first()
         if user:
             # Delete user
+            user_id = user.id
             db.session.delete(user)
             db.session.commit()
+            # Logs the user out of running servers on this machine
+            user_cache.invalidate(user_id)
             print(f"User {username} deleted successfully!")
         else:
             print(f"No user found with username: {username}")
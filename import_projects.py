@@ -0,0 +1,23 @@
+from rpmt import app
+from rpmt.models import User
+from rpmt.importer import import_projects
+import sys
+
+def import_file(username, path):
+    with app.app_context():
+        # Imported projects are added under this user, like projects added through the form
+        user = User.query.filter_by(username=username).first()
+        if not user:
+            print(f"No user found with username: {username}")
+            return
+        with open(path, encoding='utf-8-sig') as import_file:
+            result = import_projects(import_file.read(), path, user.id)
+        for line, message in result.errors:
+            print(f"Line {line}: {message}")
+        print(f"Imported {result.imported} projects, {len(result.errors)} rows were skipped.")
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python import_projects.py <username> <file.csv|file.bib>")
+    else:
+        import_file(sys.argv[1], sys.argv[2])
@@ -0,0 +1,56 @@
+"""Add indexes and unique constraints for hot query columns
+
+Revision ID: 3f1c2a7d9e10
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7d9e10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Links duplicated by repeated names in old submissions would block the unique constraints
+    op.execute("DELETE FROM author_project WHERE id NOT IN "
+               "(SELECT MIN(id) FROM author_project GROUP BY author_id, project_id)")
+    op.execute("DELETE FROM editor_project WHERE id NOT IN "
+               "(SELECT MIN(id) FROM editor_project GROUP BY editor_id, project_id)")
+
+    with op.batch_alter_table('author_project', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_author_project', ['author_id', 'project_id'])
+        batch_op.create_index(batch_op.f('ix_author_project_project_id'), ['project_id'], unique=False)
+
+    with op.batch_alter_table('editor_project', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_editor_project', ['editor_id', 'project_id'])
+        batch_op.create_index(batch_op.f('ix_editor_project_project_id'), ['project_id'], unique=False)
+
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_project_creator_id'), ['creator_id'], unique=False)
+        batch_op.create_index('ix_project_date_published_id', ['date_published', 'id'], unique=False)
+
+    op.create_index('ix_author_name_lower', 'author', [sa.text('lower(name)')], unique=False)
+    op.create_index('ix_editor_name_lower', 'editor', [sa.text('lower(name)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_editor_name_lower', table_name='editor')
+    op.drop_index('ix_author_name_lower', table_name='author')
+
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.drop_index('ix_project_date_published_id')
+        batch_op.drop_index(batch_op.f('ix_project_creator_id'))
+
+    with op.batch_alter_table('editor_project', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_editor_project_project_id'))
+        batch_op.drop_constraint('uq_editor_project', type_='unique')
+
+    with op.batch_alter_table('author_project', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_author_project_project_id'))
+        batch_op.drop_constraint('uq_author_project', type_='unique')
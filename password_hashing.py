@@ -0,0 +1,18 @@
+import bcrypt
+
+# Password Hashing Functions
+# ----------------------------------------------------------------------------------------------
+# These run in the password hashing processes (see rpmt/passwords.py). They are kept out of the rpmt
+# package so a new process only imports bcrypt, importing rpmt would set up the whole app.
+# bcrypt only reads the first 72 bytes, newer versions raise instead of ignoring the rest
+MAX_PASSWORD_BYTES = 72
+
+def make_hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8')[:MAX_PASSWORD_BYTES], bcrypt.gensalt(rounds)).decode('utf-8')
+
+def check_hash(password_hash, password):
+    try:
+        return bcrypt.checkpw(password.encode('utf-8')[:MAX_PASSWORD_BYTES], password_hash.encode('utf-8'))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
@@ -2,11 +2,11 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
-from flask_migrate import Migrate
 
-from supabase import create_client
+from rpmt.storage_backends import get_storage_backend
 from dotenv import load_dotenv
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
 from io import StringIO
@@ -25,11 +25,23 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = SECRET_KEY
 app.config['MAX_CONTENT_LENGTH'] = 64 * 1024 * 1024
 
-# Supabase
+# Storage
 # ----------------------------------------------------------------------------------------------
+# "supabase" (default) or "local" to keep attachments in LOCAL_STORAGE_DIR
+# The Supabase client is only created once a file is uploaded, deleted or downloaded
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+storage = get_storage_backend(
+    STORAGE_BACKEND,
+    supabase_url=SUPABASE_URL,
+    supabase_key=SUPABASE_KEY,
+    # Hand out signed URLs that expire after this many seconds instead of public URLs (0 to disable)
+    signed_url_ttl=int(os.getenv("SIGNED_URL_TTL", 0)),
+    exists_cache_ttl=int(os.getenv("EXISTS_CACHE_TTL", 60)),
+    exists_cache_size=int(os.getenv("EXISTS_CACHE_SIZE", 1024)),
+    local_directory=os.getenv("LOCAL_STORAGE_DIR", str(Path.cwd() / 'storage'))
+)
 
 # Database
 # ----------------------------------------------------------------------------------------------
@@ -39,8 +51,31 @@ supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 DATABASE_URI = os.getenv("DATABASE_URI")
 app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Connection pool, every server thread needs a connection while it handles a request so keep
+# DB_POOL_SIZE + DB_MAX_OVERFLOW at or above SERVER_THREADS. Remote databases (Supabase) drop idle
+# connections, pre ping replaces dead ones before use and recycle retires them after that many seconds.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() not in ("0", "false", "no")
+engine_options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+# In-memory SQLite uses a single connection pool that takes no size settings
+if DATABASE_URI and not DATABASE_URI.startswith("sqlite:///:memory:") and DATABASE_URI != "sqlite://":
+    engine_options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
 db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+
+# The search index tables are managed by rpmt/search.py, keep them out of autogenerated migrations
+def include_name(name, type_, parent_names):
+    return not (type_ == "table" and name.startswith("project_search"))
+
+# Flask-Migrate pulls in alembic, so it is only set up for the flask command line (flask db ...)
+# and not when the server starts from app.py or RPMT.exe
+if os.getenv("FLASK_RUN_FROM_CLI"):
+    from flask_migrate import Migrate
+    migrate = Migrate(app, db, render_as_batch=True, include_name=include_name)
 
 # Authentication
 # ----------------------------------------------------------------------------------------------
@@ -49,8 +84,13 @@ login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 login_manager.login_message_category = 'info'
 
-# Supabase Functions
+# Storage Functions
 # ----------------------------------------------------------------------------------------------
+# Storage calls are timed and counted for /metrics, see rpmt/metrics.py
+from rpmt.metrics import storage_timer
+
+upload_executor = ThreadPoolExecutor(max_workers=int(os.getenv("UPLOAD_WORKERS", 3)), thread_name_prefix="upload")
+
 def upload_file(filename, file_content):
     try:
         _, ext = os.path.splitext(filename)
@@ -64,23 +104,35 @@ def upload_file(filename, file_content):
             file_content = file_content.getvalue().encode('utf-8')
         elif isinstance(file_content, str):
             file_content = file_content.encode('utf-8')
-        else:
-            file_content = file_content.read()
 
-        supabase.storage.from_('RPMT').upload(filename, file_content, {"content-type": mime})
+        with storage_timer("upload"):
+            storage.upload(filename, file_content, mime)
+        return True
     except Exception as e:
         print(f"Error uploading file: {str(e)}")
+        return False
+
+# Uploads every filename -> file content pair concurrently and returns filename -> success
+def upload_files(files):
+    filenames = list(files)
+    with storage_timer("upload_files"):
+        results = list(upload_executor.map(upload_file, filenames, [files[filename] for filename in filenames]))
+    return dict(zip(filenames, results))
+
+# Removes several files in one request, errors are raised so the caller can retry
+def delete_files(filenames):
+    with storage_timer("remove"):
+        storage.remove(list(filenames))
 
-def delete_file(filename):
-    try:
-        supabase.storage.from_('RPMT').remove([filename])
-    except Exception as e:
-        print(f"Error deleting file: {str(e)}")
-        
 def get_file_url(filename):
     try:
-        return supabase.storage.from_('RPMT').get_public_url(filename)
-    except:
-        print(f"Error deleting file: {str(e)}")
+        with storage_timer("get_url"):
+            return storage.get_url(filename)
+    except Exception as e:
+        print(f"Error getting file URL: {str(e)}")
+
+def file_exists(filename, url):
+    with storage_timer("exists"):
+        return storage.exists(filename, url)
 
 from rpmt import routes
\ No newline at end of file
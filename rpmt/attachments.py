@@ -0,0 +1,86 @@
+from rpmt import db
+from rpmt.models import Attachment
+from rpmt.deletions import enqueue_file_deletions
+from rpmt.inserts import insert_ignoring_conflicts
+from sqlalchemy import update
+from collections import Counter
+import tempfile
+import hashlib
+import os
+
+# Content Addressed Attachments
+# ----------------------------------------------------------------------------------------------
+# Uploaded files are stored under the SHA-256 of their content plus their extension, so the same
+# letter or PDF attached to several projects is stored and transferred once. The attachment table
+# counts the project fields that point at each file. A file is only queued for deletion once its
+# count drops to zero, and files uploaded before this (name_timestamp.ext) count as one reference.
+# The file deleter marks the rows of the files it removes with deleting_since while holding their row
+# locks. acquire_attachments takes the same locks, so a request that found a file stored and saves
+# it after the deleter removed it is told to upload it again.
+PLACEHOLDER_FILES = ('none.png', 'none.pdf')
+HASH_CHUNK_SIZE = 1024 * 1024
+SPOOL_SIZE = 1024 * 1024
+
+# Hashes an uploaded file while copying it to a spooled temporary file, returns (filename, content)
+def read_attachment(file):
+    digest = hashlib.sha256()
+    content = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    for chunk in iter(lambda: file.stream.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+        content.write(chunk)
+    file.close()
+    content.seek(0)
+    _, extension = os.path.splitext(file.filename)
+    return f"{digest.hexdigest()}{extension.lower()}", content
+
+def get_counts(filenames):
+    return Counter(filename for filename in filenames if filename and filename not in PLACEHOLDER_FILES)
+
+# Returns the filenames that are not already stored for another project
+def missing_attachments(filenames):
+    filenames = list(filenames)
+    if not filenames:
+        return []
+    stored = {filename for filename, in db.session.query(Attachment.filename)
+                                              .filter(Attachment.filename.in_(filenames),
+                                                      Attachment.reference_count > 0,
+                                                      Attachment.deleting_since.is_(None))}
+    return [filename for filename in filenames if filename not in stored]
+
+def insert_attachments(filenames):
+    insert_ignoring_conflicts(Attachment, [{"filename": filename, "reference_count": 0} for filename in filenames], 'filename')
+
+def change_reference_counts(counts, sign):
+    for filename, count in counts.items():
+        values = {"reference_count": Attachment.reference_count + sign * count}
+        if sign > 0:
+            values["deleting_since"] = None
+        db.session.execute(update(Attachment).where(Attachment.filename == filename).values(**values))
+
+# Adds a reference for every project field now pointing at one of the filenames. Returns the ones
+# the file deleter removed from storage, which the caller has to upload again before committing.
+def acquire_attachments(filenames):
+    counts = get_counts(filenames)
+    if not counts:
+        return []
+    insert_attachments(list(counts))
+    # Waits for a deleter that is removing one of the files and then reads the row it left
+    removed = [filename for filename, deleting_since in
+               db.session.query(Attachment.filename, Attachment.deleting_since)
+                         .filter(Attachment.filename.in_(list(counts)))
+                         .order_by(Attachment.filename)
+                         .with_for_update()
+               if deleting_since is not None]
+    change_reference_counts(counts, 1)
+    return removed
+
+# Drops a reference for every project field that stopped pointing at one of the filenames and
+# queues the files nothing points at anymore for deletion. Nothing here commits.
+def release_attachments(filenames):
+    counts = get_counts(filenames)
+    if not counts:
+        return
+    change_reference_counts(counts, -1)
+    remaining = dict(db.session.query(Attachment.filename, Attachment.reference_count)
+                               .filter(Attachment.filename.in_(list(counts))))
+    enqueue_file_deletions([filename for filename in counts if remaining.get(filename, 0) <= 0])
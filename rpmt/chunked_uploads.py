@@ -0,0 +1,139 @@
+from rpmt.file_lock import lock_file
+from werkzeug.datastructures import FileStorage
+import threading
+import tempfile
+import secrets
+import json
+import time
+import re
+import os
+
+# Resumable Chunked Uploads
+# ----------------------------------------------------------------------------------------------
+# Large attachments can be sent in pieces instead of one multipart POST, similar to the tus protocol:
+#   POST  /uploads            with Upload-Length and Upload-Filename headers creates an upload
+#   HEAD  /uploads/<token>    returns the Upload-Offset to resume from after a dropped connection
+#   PATCH /uploads/<token>    with Upload-Offset appends the request body at that offset
+# Chunks are written straight to a part file in CHUNKED_UPLOAD_DIR. Once every byte has arrived
+# the token is sent with the project form in place of the file, see claim_chunked_uploads.
+# Uploads that were never used are removed after CHUNKED_UPLOAD_TTL seconds.
+CHUNK_SIZE = 1024 * 1024
+TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class ChunkedUploads:
+    def __init__(self, directory, max_length, ttl=24 * 60 * 60):
+        self.directory = directory
+        self.max_length = max_length
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.upload_locks = {}
+
+    def part_path(self, token):
+        if not TOKEN_PATTERN.match(token or ""):
+            raise UploadError("Unknown upload", 404)
+        return os.path.join(self.directory, f"{token}.part")
+
+    def info_path(self, token):
+        return self.part_path(token)[:-len(".part")] + ".json"
+
+    def get_info(self, token, user_id):
+        try:
+            with open(self.info_path(token)) as info_file:
+                info = json.load(info_file)
+            info["offset"] = os.path.getsize(self.part_path(token))
+        except (OSError, ValueError):
+            raise UploadError("Unknown upload", 404)
+        if info["user_id"] != user_id:
+            raise UploadError("Unknown upload", 404)
+        return info
+
+    def get_lock(self, token):
+        with self.lock:
+            return self.upload_locks.setdefault(token, threading.Lock())
+
+    def create(self, filename, length, user_id):
+        if not filename or length is None or length < 0:
+            raise UploadError("Upload-Filename and Upload-Length are required")
+        if length > self.max_length:
+            raise UploadError("Upload is too large", 413)
+        os.makedirs(self.directory, exist_ok=True)
+        self.remove_expired()
+
+        token = secrets.token_urlsafe(24)
+        open(self.part_path(token), 'wb').close()
+        with open(self.info_path(token), 'w') as info_file:
+            json.dump({"filename": os.path.basename(filename), "length": length,
+                       "user_id": user_id, "created": time.time()}, info_file)
+        return token
+
+    # Appends a chunk read from the stream in CHUNK_SIZE pieces, returns the new offset
+    # The part file is locked while writing so the other server workers wait for the chunk too
+    def append(self, token, user_id, offset, stream):
+        with self.get_lock(token):
+            self.get_info(token, user_id)
+            try:
+                # r+b doesn't create the part file again if the upload was removed meanwhile
+                part_file = open(self.part_path(token), 'r+b')
+            except FileNotFoundError:
+                raise UploadError("Unknown upload", 404)
+            with part_file:
+                lock_file(part_file)
+                info = self.get_info(token, user_id)
+                if offset != info["offset"]:
+                    raise UploadError("Upload-Offset does not match the uploaded size", 409)
+                part_file.seek(offset)
+                written = 0
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    written += len(chunk)
+                    if offset + written > info["length"]:
+                        part_file.truncate(offset)
+                        raise UploadError("Chunk goes past Upload-Length", 413)
+                    part_file.write(chunk)
+            return offset + written
+
+    # Opens a finished upload as a FileStorage, like a file sent with the form
+    def open(self, token, user_id):
+        info = self.get_info(token, user_id)
+        if info["offset"] != info["length"]:
+            raise UploadError(f"{info['filename']} has not finished uploading", 409)
+        return FileStorage(stream=open(self.part_path(token), 'rb'), filename=info["filename"])
+
+    def remove(self, token):
+        for path in [self.part_path(token), self.info_path(token)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        with self.lock:
+            self.upload_locks.pop(token, None)
+
+    def remove_expired(self):
+        cutoff = time.time() - self.ttl
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                self.remove(entry.name[:-len(".json")])
+
+chunked_uploads = ChunkedUploads(
+    directory=os.getenv("CHUNKED_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "rpmt-uploads")),
+    max_length=int(os.getenv("CHUNKED_UPLOAD_MAX_SIZE", 64)) * 1024 * 1024,
+    ttl=int(os.getenv("CHUNKED_UPLOAD_TTL", 24 * 60 * 60))
+)
+
+# Replaces the file fields whose <field>_upload token is set with the finished chunked upload, so the
+# form validators and the save code treat it like a file sent with the form. Returns the used tokens.
+def claim_chunked_uploads(form, user_id, fields):
+    tokens = []
+    for field_name in fields:
+        field = getattr(form, field_name)
+        token = getattr(form, f"{field_name}_upload").data
+        if token and not field.data:
+            file = chunked_uploads.open(token, user_id)
+            field.data = file
+            field.raw_data = [file]
+            tokens.append(token)
+    return tokens
@@ -0,0 +1,84 @@
+from rpmt import app, db, delete_files
+from rpmt.models import FileDeletion, Attachment
+from rpmt.images import rendition_filenames
+from rpmt.inserts import insert_ignoring_conflicts
+from sqlalchemy import update
+from datetime import datetime, timedelta
+
+# Attachment Deletion Queue
+# ----------------------------------------------------------------------------------------------
+# Requests only add rows to the file_deletion table, inside the same transaction as the project
+# change that orphaned the files. A background task removes them from the bucket in batches and
+# retries failures with exponential backoff. Files that still fail after MAX_ATTEMPTS are left in
+# the table and reported as leaked. Attachments that were referenced again since they were queued
+# (see rpmt/attachments.py) are dropped from the queue and kept.
+# The attachment rows of a batch are marked with deleting_since before the files are removed, and
+# the transaction holding their locks is only committed after the remove. A request saving one of
+# these files waits for it and then uploads the file again. Marked rows without references are
+# kept for DELETED_ROW_TTL so a slow request still finds the mark, then dropped.
+DELETE_BATCH_SIZE = 100
+MAX_ATTEMPTS = 8
+BASE_RETRY_DELAY = 30
+MAX_RETRY_DELAY = 6 * 60 * 60
+DELETED_ROW_TTL = timedelta(days=1)
+
+def enqueue_file_deletions(filenames):
+    for filename in filenames:
+        db.session.add(FileDeletion(filename=filename))
+
+def get_retry_delay(attempts):
+    return timedelta(seconds=min(BASE_RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+def process_file_deletions(batch_size=DELETE_BATCH_SIZE):
+    deleted = 0
+    while True:
+        now = datetime.utcnow()
+        batch = FileDeletion.query.filter(FileDeletion.next_attempt <= now,
+                                          FileDeletion.attempts < MAX_ATTEMPTS) \
+                                  .order_by(FileDeletion.next_attempt) \
+                                  .limit(batch_size).all()
+        if not batch:
+            break
+        filenames = {deletion.filename for deletion in batch}
+        # Files queued without a row (failed uploads, old file names) get one, so they can be marked too
+        insert_ignoring_conflicts(Attachment, [{"filename": filename, "reference_count": 0} for filename in filenames], 'filename')
+        # Marking the unused rows locks them until the commit below
+        unused = set(db.session.scalars(
+            update(Attachment).where(Attachment.filename.in_(filenames), Attachment.reference_count <= 0)
+                              .values(deleting_since=now)
+                              .returning(Attachment.filename)
+        ))
+        try:
+            if unused:
+                delete_files(unused.union(*[rendition_filenames(filename) for filename in unused]))
+            for deletion in batch:
+                db.session.delete(deletion)
+            deleted += len(unused)
+        except Exception as e:
+            for deletion in batch:
+                deletion.attempts += 1
+                deletion.next_attempt = now + get_retry_delay(deletion.attempts)
+                deletion.last_error = str(e)[:500]
+            db.session.commit()
+            print(f"Error deleting files, retrying later: {str(e)}")
+            break
+        db.session.commit()
+
+    Attachment.query.filter(Attachment.deleting_since < datetime.utcnow() - DELETED_ROW_TTL,
+                            Attachment.reference_count <= 0).delete(synchronize_session=False)
+    db.session.commit()
+
+    leaked = leaked_files()
+    if leaked:
+        print(f"Warning: {len(leaked)} files could not be deleted from storage: {', '.join(leaked)}")
+    return deleted
+
+def leaked_files():
+    return [deletion.filename for deletion in FileDeletion.query.filter(FileDeletion.attempts >= MAX_ATTEMPTS)]
+
+@app.cli.command("delete-files")
+def delete_files_command():
+    FileDeletion.query.filter(FileDeletion.attempts >= MAX_ATTEMPTS) \
+                      .update({"attempts": 0, "next_attempt": datetime.utcnow()})
+    db.session.commit()
+    print(f"Deleted {process_file_deletions()} files.")
@@ -0,0 +1,204 @@
+from rpmt.file_lock import lock_file
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import threading
+import tempfile
+import hashlib
+import shutil
+import json
+import time
+import os
+
+# Local Attachment Cache
+# ----------------------------------------------------------------------------------------------
+# Optional on-disk cache of downloaded attachments, enabled by setting ATTACHMENT_CACHE_DIR.
+# Files are stored once per content hash under objects/, index.json maps attachment filenames to
+# their hash, and the least recently used objects are evicted once the cache grows past
+# ATTACHMENT_CACHE_SIZE megabytes. The hash doubles as the ETag when the file is served.
+# A download that misses the cache is sent to storage right away, and the file is fetched into the
+# cache by FILL_WORKERS background threads, so no server thread waits for the whole file.
+# Server workers share the directory: changes to the index are made under a lock on index.lock after
+# reloading the index and the object list from disk, so the budget covers the files of every worker,
+# and a worker reloads them whenever index.json was replaced by another one.
+CHUNK_SIZE = 1024 * 1024
+FILL_WORKERS = 2
+
+class AttachmentCache:
+    def __init__(self, directory=None, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.names = {}
+        self.objects = OrderedDict()
+        self.index_stamp = None
+        # Filenames being fetched in the background, and the threads fetching them (started on first use)
+        self.pending = set()
+        self.executor = None
+        if directory:
+            os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+            self.load()
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    def object_path(self, content_hash):
+        return os.path.join(self.directory, 'objects', content_hash)
+
+    def index_path(self):
+        return os.path.join(self.directory, 'index.json')
+
+    def read_index_stamp(self):
+        try:
+            return os.stat(self.index_path()).st_mtime_ns
+        except OSError:
+            return None
+
+    def load(self):
+        self.index_stamp = self.read_index_stamp()
+        try:
+            with open(self.index_path()) as index_file:
+                self.names = json.load(index_file)
+        except (OSError, ValueError):
+            self.names = {}
+        # Rebuild the LRU order from the object modification times, which are touched on every hit
+        self.objects = OrderedDict()
+        entries = []
+        for entry in os.scandir(os.path.join(self.directory, 'objects')):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, content_hash, size in sorted(entries):
+            self.objects[content_hash] = size
+
+    def save_index(self):
+        temp_path = self.index_path() + '.tmp'
+        with open(temp_path, 'w') as index_file:
+            json.dump(self.names, index_file)
+        os.replace(temp_path, self.index_path())
+        self.index_stamp = self.read_index_stamp()
+
+    # Called with the lock held
+    def reload_if_changed(self):
+        if self.read_index_stamp() != self.index_stamp:
+            self.load()
+
+    # Runs change() with the index of every worker loaded, then saves it
+    def update_index(self, change):
+        with self.lock, open(os.path.join(self.directory, 'index.lock'), 'a') as lock:
+            lock_file(lock)
+            self.load()
+            change()
+            self.evict()
+            self.save_index()
+
+    # Returns (path, content hash, cached time) for a cached attachment or None
+    def get(self, filename):
+        with self.lock:
+            self.reload_if_changed()
+            entry = self.names.get(filename)
+            if not entry or entry['hash'] not in self.objects:
+                return None
+            path = self.object_path(entry['hash'])
+            try:
+                os.utime(path)
+            except OSError:
+                self.objects.pop(entry['hash'], None)
+                return None
+            self.objects.move_to_end(entry['hash'])
+            return path, entry['hash'], entry['cached']
+
+    # Moves a finished file into the cache under its content hash
+    def add(self, filename, temp_path, content_hash):
+        def change():
+            path = self.object_path(content_hash)
+            if content_hash in self.objects:
+                os.remove(temp_path)
+                os.utime(path)
+            else:
+                shutil.move(temp_path, path)
+                self.objects[content_hash] = os.path.getsize(path)
+            self.objects.move_to_end(content_hash)
+            self.names[filename] = {"hash": content_hash, "cached": time.time()}
+        self.update_index(change)
+
+    # Copies a local file (e.g. a finished upload) into the cache
+    def store(self, filename, source_path):
+        if not self.enabled:
+            return
+        try:
+            digest = hashlib.sha256()
+            with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as temp_file, \
+                 open(source_path, 'rb') as source:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            self.add(filename, temp_file.name, digest.hexdigest())
+        except OSError as e:
+            print(f"Error caching file: {str(e)}")
+
+    # Streams a file from its storage URL into the cache, returning the same tuple as get()
+    def fetch(self, filename, url):
+        import requests
+        temp_path = None
+        try:
+            digest = hashlib.sha256()
+            with requests.get(url, stream=True, timeout=30) as response:
+                if response.status_code != 200:
+                    return None
+                with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as temp_file:
+                    temp_path = temp_file.name
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        digest.update(chunk)
+                        temp_file.write(chunk)
+            self.add(filename, temp_path, digest.hexdigest())
+            temp_path = None
+            return self.get(filename)
+        except (OSError, requests.RequestException) as e:
+            print(f"Error caching file: {str(e)}")
+            return None
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    # Fetches a file into the cache in the background, unless it is being fetched already
+    def fetch_later(self, filename, url):
+        with self.lock:
+            if filename in self.pending:
+                return
+            self.pending.add(filename)
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=FILL_WORKERS, thread_name_prefix="cache-fill")
+        self.executor.submit(self.fill, filename, url)
+
+    def fill(self, filename, url):
+        try:
+            self.fetch(filename, url)
+        finally:
+            with self.lock:
+                self.pending.discard(filename)
+
+    def forget(self, filename):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.reload_if_changed()
+            if filename not in self.names:
+                return
+        self.update_index(lambda: self.names.pop(filename, None))
+
+    def evict(self):
+        total = sum(self.objects.values())
+        while total > self.max_bytes and len(self.objects) > 1:
+            content_hash, size = self.objects.popitem(last=False)
+            try:
+                os.remove(self.object_path(content_hash))
+            except OSError:
+                pass
+            total -= size
+        live = set(self.objects)
+        self.names = {name: entry for name, entry in self.names.items() if entry['hash'] in live}
+
+attachment_cache = AttachmentCache(
+    directory=os.getenv("ATTACHMENT_CACHE_DIR"),
+    max_bytes=int(os.getenv("ATTACHMENT_CACHE_SIZE", 512)) * 1024 * 1024
+)
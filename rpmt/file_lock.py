@@ -0,0 +1,14 @@
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# File Locks
+# ----------------------------------------------------------------------------------------------
+# With SERVER_WORKERS above 1 the worker processes share the files of the attachment cache and the
+# chunked uploads, thread locks only keep out the other threads of the same process.
+# lock_file takes an exclusive lock on an open file, which is released when the file is closed.
+# Windows has no fcntl, but it also always runs a single process.
+def lock_file(open_file):
+    if fcntl:
+        fcntl.flock(open_file.fileno(), fcntl.LOCK_EX)
@@ -1,5 +1,5 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, IntegerField, BooleanField, DateField, SubmitField, TextAreaField, SelectField, FileField, EmailField
+from wtforms import StringField, IntegerField, BooleanField, DateField, SubmitField, TextAreaField, SelectField, FileField, EmailField, HiddenField
 from wtforms.validators import DataRequired, Length, Optional, InputRequired, NumberRange, EqualTo
 from flask_wtf.file import FileAllowed
 
@@ -86,4 +86,13 @@ class ProjectForm(FlaskForm):
     pdf = FileField('PDF File of Project',
                     validators=[Optional(), FileAllowed(['pdf'])])
     clear_pdf = BooleanField('Remove PDF (Ignore if new project or adding new PDF)')
-    submit = SubmitField('Submit')
\ No newline at end of file
+    # Tokens of files sent through the chunked upload API instead of the file fields
+    publication_proof_upload = HiddenField()
+    utilization_proof_upload = HiddenField()
+    pdf_upload = HiddenField()
+    submit = SubmitField('Submit')
+
+class ImportForm(FlaskForm):
+    file = FileField('CSV or BibTeX File',
+                     validators=[DataRequired(), FileAllowed(['csv', 'bib'])])
+    submit = SubmitField('Import')
@@ -0,0 +1,67 @@
+from io import BytesIO
+import os
+
+# Proof Image Renditions
+# ----------------------------------------------------------------------------------------------
+# Publication and utilization proofs are often full size phone photos. When an image is uploaded
+# a compressed display copy and a small thumbnail are stored next to it (<name>_display.jpg and
+# <name>_thumb.jpg), the project page shows those and the original is only sent on download.
+# Pillow is imported on first use so it doesn't slow down startup, without it no renditions are made
+# and the project page falls back to the original.
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+RENDITIONS = {
+    "display": (1600, 80),
+    "thumb": (320, 70)
+}
+
+def is_image(filename):
+    return os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS
+
+def rendition_filename(filename, rendition):
+    name, _ = os.path.splitext(filename)
+    return f"{name}_{rendition}.jpg"
+
+def rendition_filenames(filename):
+    if not is_image(filename):
+        return []
+    return [rendition_filename(filename, rendition) for rendition in RENDITIONS]
+
+# Returns rendition filename -> JPEG bytes for an uploaded image, or {} if it can't be processed
+def make_renditions(filename, content):
+    if not is_image(filename):
+        return {}
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return {}
+
+    renditions = {}
+    try:
+        content.seek(0)
+        with Image.open(content) as image:
+            # Lets the JPEG decoder scale down while decoding instead of loading every pixel
+            largest = max(size for size, _ in RENDITIONS.values())
+            image.draft('RGB', (largest, largest))
+            image = to_rgb(ImageOps.exif_transpose(image))
+        for rendition, (size, quality) in RENDITIONS.items():
+            resized = image.copy()
+            resized.thumbnail((size, size))
+            output = BytesIO()
+            resized.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+            renditions[rendition_filename(filename, rendition)] = output.getvalue()
+    except Exception as e:
+        print(f"Error making image renditions: {str(e)}")
+        return {}
+    finally:
+        content.seek(0)
+    return renditions
+
+# JPEG has no alpha channel, transparent images are flattened onto white
+def to_rgb(image):
+    from PIL import Image
+    if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
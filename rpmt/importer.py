@@ -0,0 +1,273 @@
+from rpmt import app, db
+from rpmt.models import Project, Author, Editor, AuthorProject, EditorProject
+from rpmt.forms import ProjectForm
+from rpmt.names import split_names, add_project_links
+from rpmt.search import ensure_search_index, index_new_projects
+from rpmt.reports import REPORT_FIELDS, report_cache
+from werkzeug.datastructures import MultiDict
+from wtforms.validators import Optional, Length
+from flask import has_request_context
+from contextlib import nullcontext
+from sqlalchemy import insert
+from io import StringIO
+import csv
+import re
+
+# Bulk Project Import
+# ----------------------------------------------------------------------------------------------
+# Imports projects from a CSV file with the columns of the report export (plus optional type and
+# abstract columns) or from a BibTeX file. Every row is checked with the ProjectForm rules, rows
+# with errors are skipped and reported by line, and the rest are inserted IMPORT_BATCH_SIZE at a
+# time with the author and editor names of the whole batch resolved together.
+IMPORT_BATCH_SIZE = 500
+DEFAULT_TYPE = "Journal Article"
+BOOLEAN_FIELDS = [
+    "web_of_science", "elsevier_scopus", "elsevier_sciencedirect", "pubmed_medline", "ched_recognized"
+]
+IMPORT_FIELDS = REPORT_FIELDS + ["type", "abstract"]
+BIBTEX_TYPES = {
+    "article": "Journal Article",
+    "inproceedings": "Conference Paper",
+    "conference": "Conference Paper",
+    "book": "Book",
+    "incollection": "Book Chapter",
+    "inbook": "Book Chapter",
+    "phdthesis": "Thesis",
+    "mastersthesis": "Thesis",
+    "techreport": "Technical Report"
+}
+# BibTeX has no publisher type, it is derived from the entry type instead
+BIBTEX_PUBLISHER_TYPES = {
+    "article": "Journal",
+    "inproceedings": "Conference",
+    "conference": "Conference",
+    "proceedings": "Conference",
+    "book": "Book Publisher",
+    "incollection": "Book Publisher",
+    "inbook": "Book Publisher",
+    "phdthesis": "University",
+    "mastersthesis": "University",
+    "techreport": "Institution"
+}
+DEFAULT_PUBLISHER_TYPE = "Other"
+# Filled in for the required fields a BibTeX entry often leaves out (publisher, address, volume)
+NOT_GIVEN = "N/A"
+MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+# CSV Files
+# ----------------------------------------------------------------------------------------------
+# Yields (line number, row) for every data row, with the report's True/False columns kept as text
+def read_csv(text):
+    reader = csv.DictReader(StringIO(text))
+    for row in reader:
+        yield reader.line_num, {field: (value or "").strip() for field, value in row.items() if field in IMPORT_FIELDS}
+
+# BibTeX Files
+# ----------------------------------------------------------------------------------------------
+# A small parser for the entries reference managers export: @type{key, field = {value} | "value" | number}
+def parse_bibtex_value(text, position):
+    if position >= len(text):
+        raise ValueError("Missing value")
+    if text[position] == '{':
+        depth = 0
+        for end in range(position, len(text)):
+            if text[end] == '{':
+                depth += 1
+            elif text[end] == '}':
+                depth -= 1
+                if depth == 0:
+                    return text[position + 1:end], end + 1
+        raise ValueError("Unclosed brace")
+    if text[position] == '"':
+        end = text.index('"', position + 1)
+        return text[position + 1:end], end + 1
+    match = re.compile(r"[^,}\s]+").match(text, position)
+    return match.group(0), match.end()
+
+def parse_bibtex_entries(text):
+    for match in re.finditer(r"@(\w+)\s*\{\s*[^,\s]*\s*,", text):
+        entry_type = match.group(1).lower()
+        if entry_type in ("comment", "string", "preamble"):
+            continue
+        line = text.count('\n', 0, match.start()) + 1
+        fields = {}
+        position = match.end()
+        try:
+            while True:
+                field = re.compile(r"\s*(\w+)\s*=\s*").match(text, position)
+                if not field:
+                    break
+                value, position = parse_bibtex_value(text, field.end())
+                fields[field.group(1).lower()] = ' '.join(value.replace('{', '').replace('}', '').split())
+                separator = re.compile(r"\s*,?").match(text, position)
+                position = separator.end()
+        except (ValueError, AttributeError):
+            yield line, entry_type, None
+            continue
+        yield line, entry_type, fields
+
+# BibTeX names are "Last, First and First Last", RPMT separates names with ", " so they become "First Last"
+def bibtex_names(value):
+    names = []
+    for name in re.split(r"\s+and\s+", value or ""):
+        if ',' in name:
+            last, first = name.split(',', 1)
+            name = f"{first.strip()} {last.strip()}"
+        if name.strip():
+            names.append(name.strip())
+    return ', '.join(names)
+
+def bibtex_date(fields):
+    year = fields.get("year", "")
+    month = fields.get("month", "1").lower()[:3]
+    month = MONTHS.index(month) + 1 if month in MONTHS else int(month) if month.isdigit() else 1
+    day = int(fields["day"]) if fields.get("day", "").isdigit() else 1
+    return f"{year}-{month:02d}-{day:02d}" if year else ""
+
+# Maps a BibTeX entry to the import columns, fields that are already named like a column are kept
+# Entries still need a title, author, year, journal/booktitle/school and doi or url
+def bibtex_row(entry_type, fields):
+    row = {field: value for field, value in fields.items() if field in IMPORT_FIELDS}
+    volume_issue = ' '.join(part for part in [
+        f"Vol. {fields['volume']}" if fields.get("volume") else "",
+        f"No. {fields['number']}" if fields.get("number") else ""
+    ] if part)
+    doi = fields.get("doi", "")
+    mapped = {
+        "type": BIBTEX_TYPES.get(entry_type, entry_type.title()),
+        "date_published": bibtex_date(fields),
+        "authors": bibtex_names(fields.get("author")),
+        "editors": bibtex_names(fields.get("editor")),
+        "publication_name": fields.get("journal") or fields.get("booktitle") or fields.get("school") or "",
+        "publisher": fields.get("institution") or fields.get("school") or fields.get("organization") or NOT_GIVEN,
+        "publisher_type": BIBTEX_PUBLISHER_TYPES.get(entry_type, DEFAULT_PUBLISHER_TYPE),
+        "publisher_location": fields.get("address") or NOT_GIVEN,
+        "vol_issue_no": volume_issue or NOT_GIVEN,
+        "doi_url": f"https://doi.org/{doi}" if doi and not doi.startswith("http") else doi or fields.get("url", ""),
+        "isbn_issn": "ISSN" if fields.get("issn") else "ISBN" if fields.get("isbn") else "NONE"
+    }
+    for field, value in mapped.items():
+        if value and not row.get(field):
+            row[field] = value
+    return row
+
+def read_bibtex(text):
+    for line, entry_type, fields in parse_bibtex_entries(text):
+        yield line, (bibtex_row(entry_type, fields) if fields is not None else None)
+
+# Validation and Inserting
+# ----------------------------------------------------------------------------------------------
+def is_true(value):
+    return (value or "").strip().lower() in ("true", "1", "yes", "y", "x")
+
+# Checks a row with the ProjectForm rules, returns (project values, authors, editors) or the errors
+# The same form is reused for every row, binding a new ProjectForm costs more than validating it
+def validate_row(form, row):
+    data = {field: value for field, value in row.items() if field not in BOOLEAN_FIELDS}
+    data["type"] = data.get("type") or DEFAULT_TYPE
+    data["citations"] = data.get("citations") or "0"
+    for field in BOOLEAN_FIELDS:
+        if is_true(row.get(field)):
+            data[field] = "y"
+    form.process(formdata=MultiDict(data))
+    if not form.validate():
+        return None, [f"{getattr(form, field).label.text}: {' '.join(messages)}" for field, messages in form.errors.items()]
+    values = {
+        "title": form.title.data,
+        "abstract": form.abstract.data or "No abstract provided",
+        "type": form.type.data,
+        "date_published": form.date_published.data,
+        "publication_name": form.publication_name.data,
+        "publisher": form.publisher.data,
+        "publisher_type": form.publisher_type.data,
+        "publisher_location": form.publisher_location.data,
+        "vol_issue_no": form.vol_issue_no.data,
+        "doi_url": form.doi_url.data,
+        "isbn_issn": form.isbn_issn.data,
+        "other_database": form.other_database.data or "",
+        "citations": form.citations.data,
+        "publication_proof": "none.png",
+        "utilization_proof": "none.png",
+        "pdf": "none.pdf"
+    }
+    for field in BOOLEAN_FIELDS:
+        values[field] = getattr(form, field).data
+    return (values, split_names(form.authors.data), split_names(form.editors.data)), None
+
+def insert_batch(batch, creator_id):
+    rows = [dict(values, creator_id=creator_id) for _, (values, _, _) in batch]
+    project_ids = db.session.scalars(
+        insert(Project).returning(Project.id, sort_by_parameter_order=True), rows
+    ).all()
+    add_project_links(Author, AuthorProject, 'author_id',
+                      {project_id: authors for project_id, (_, (_, authors, _)) in zip(project_ids, batch)})
+    add_project_links(Editor, EditorProject, 'editor_id',
+                      {project_id: editors for project_id, (_, (_, _, editors)) in zip(project_ids, batch)})
+    index_new_projects([(project_id, values["title"], values["abstract"], authors, editors)
+                        for project_id, (_, (values, authors, editors)) in zip(project_ids, batch)])
+    db.session.commit()
+
+def import_rows(rows, creator_id, batch_size=IMPORT_BATCH_SIZE):
+    result = ImportResult()
+    batch = []
+    seen_dois = set()
+
+    def flush():
+        # Skip DOIs that are already in the database, one query per batch
+        dois = [values["doi_url"] for _, (values, _, _) in batch]
+        existing = {doi for doi, in db.session.query(Project.doi_url).filter(Project.doi_url.in_(dois))}
+        for line, (values, _, _) in batch:
+            if values["doi_url"] in existing:
+                result.add_error(line, f"A project with the DOI URL {values['doi_url']} already exists")
+        new_rows = [item for item in batch if item[1][0]["doi_url"] not in existing]
+        if new_rows:
+            try:
+                insert_batch(new_rows, creator_id)
+                result.imported += len(new_rows)
+            except Exception as e:
+                db.session.rollback()
+                result.add_error(new_rows[0][0], f"Rows up to line {new_rows[-1][0]} were not imported: {str(e)}")
+        batch.clear()
+
+    # The search index is created up front so creating it can't pick up half of a batch
+    ensure_search_index()
+    # ProjectForm needs a request context, the command line has none
+    with nullcontext() if has_request_context() else app.test_request_context():
+        form = ProjectForm(formdata=None, meta={"csrf": False})
+        # Imported projects may have no editors, most BibTeX entries and reports list none
+        form.editors.validators = [Optional(), Length(max=512)]
+        for line, row in rows:
+            if row is None:
+                result.add_error(line, "Could not read this entry")
+                continue
+            validated, errors = validate_row(form, row)
+            if errors:
+                result.add_error(line, "; ".join(errors))
+                continue
+            doi = validated[0]["doi_url"]
+            if doi in seen_dois:
+                result.add_error(line, f"The DOI URL {doi} appears more than once in the file")
+                continue
+            seen_dois.add(doi)
+            batch.append((line, validated))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+    if result.imported:
+        report_cache.clear()
+    return result
+
+def import_projects(text, filename, creator_id):
+    if filename.lower().endswith('.bib'):
+        return import_rows(read_bibtex(text), creator_id)
+    return import_rows(read_csv(text), creator_id)
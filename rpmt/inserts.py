@@ -0,0 +1,25 @@
+from rpmt import db
+from sqlalchemy import insert
+
+# Insert Or Ignore
+# ----------------------------------------------------------------------------------------------
+# Bulk inserts rows with ON CONFLICT DO NOTHING on a unique column, so two requests adding the same
+# value at once cannot trip the unique constraint. Other databases skip the values that already
+# exist with one query first. Nothing here commits.
+def insert_ignoring_conflicts(model, rows, column):
+    if not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    # The dialect insert constructs are imported here so startup does not load every dialect
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects import postgresql
+        db.session.execute(postgresql.insert(model).values(rows).on_conflict_do_nothing(index_elements=[column]))
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects import sqlite
+        db.session.execute(sqlite.insert(model).values(rows).on_conflict_do_nothing(index_elements=[column]))
+    else:
+        key = getattr(model, column)
+        existing = {value for value, in db.session.query(key).filter(key.in_([row[column] for row in rows]))}
+        rows = [row for row in rows if row[column] not in existing]
+        if rows:
+            db.session.execute(insert(model), rows)
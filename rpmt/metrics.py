@@ -0,0 +1,158 @@
+from rpmt import app
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from contextlib import contextmanager
+import threading
+import time
+import os
+
+# Request Instrumentation
+# ----------------------------------------------------------------------------------------------
+# Every request records its latency, the number and time of its SQL queries and the time spent in
+# storage calls. The totals are added to the response as a Server-Timing header (visible in the
+# browser dev tools) and kept as Prometheus histograms per endpoint, served on /metrics.
+# Requests that run more than QUERY_BUDGET queries are reported, that is usually an N+1 loop.
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", 20))
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+class Histogram:
+    def __init__(self, name, description, labels, buckets):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = {"counts": [0] * len(self.buckets), "sum": 0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def format_labels(self, label_values, extra=""):
+        pairs = [f'{label}="{value}"' for label, value in zip(self.labels, label_values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for label_values, series in sorted(self.series.items()):
+                for bound, count in zip(self.buckets, series["counts"]):
+                    bucket_labels = self.format_labels(label_values, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+                bucket_labels = self.format_labels(label_values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {series['count']}")
+                lines.append(f"{self.name}_sum{self.format_labels(label_values)} {series['sum']}")
+                lines.append(f"{self.name}_count{self.format_labels(label_values)} {series['count']}")
+        return lines
+
+class Counter:
+    def __init__(self, name, description, labels):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def increment(self, label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for label_values, value in sorted(self.values.items()):
+                pairs = ",".join(f'{label}="{value}"' for label, value in zip(self.labels, label_values))
+                lines.append(f"{self.name}{{{pairs}}} {value}")
+        return lines
+
+request_seconds = Histogram("rpmt_request_duration_seconds", "Request latency by endpoint.",
+                            ("endpoint", "method", "status"), LATENCY_BUCKETS)
+request_queries = Histogram("rpmt_request_queries", "SQL queries per request by endpoint.",
+                            ("endpoint",), QUERY_BUCKETS)
+query_seconds = Histogram("rpmt_request_query_duration_seconds", "Time spent in SQL queries per request by endpoint.",
+                          ("endpoint",), LATENCY_BUCKETS)
+storage_seconds = Histogram("rpmt_storage_duration_seconds", "Attachment storage call latency by operation.",
+                            ("operation",), LATENCY_BUCKETS)
+storage_errors = Counter("rpmt_storage_errors_total", "Failed attachment storage calls by operation.", ("operation",))
+query_budget_exceeded = Counter("rpmt_query_budget_exceeded_total",
+                                "Requests that ran more than QUERY_BUDGET queries by endpoint.", ("endpoint",))
+
+def render_metrics():
+    lines = []
+    for metric in [request_seconds, request_queries, query_seconds, storage_seconds, storage_errors, query_budget_exceeded]:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# SQL Queries
+# ----------------------------------------------------------------------------------------------
+# Listening on the Engine class covers the engine Flask-SQLAlchemy creates without touching it here
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.query_start = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is None or not hasattr(context, "query_start"):
+        return
+    elapsed = time.perf_counter() - context.query_start
+    if has_request_context() and "request_start" in g:
+        g.query_count += 1
+        g.query_time += elapsed
+
+# Storage Calls
+# ----------------------------------------------------------------------------------------------
+@contextmanager
+def storage_timer(operation):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        storage_errors.increment((operation,))
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        storage_seconds.observe((operation,), elapsed)
+        # Uploads run on worker threads, only calls made by the request thread count towards it
+        if has_request_context() and "request_start" in g:
+            g.storage_time += elapsed
+
+# Requests
+# ----------------------------------------------------------------------------------------------
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.query_count = 0
+    g.query_time = 0
+    g.storage_time = 0
+
+@app.after_request
+def record_request_metrics(response):
+    if "request_start" not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_start
+    endpoint = request.endpoint or "unknown"
+    request_seconds.observe((endpoint, request.method, str(response.status_code)), elapsed)
+    request_queries.observe((endpoint,), g.query_count)
+    query_seconds.observe((endpoint,), g.query_time)
+
+    if g.query_count > QUERY_BUDGET:
+        query_budget_exceeded.increment((endpoint,))
+        print(f"Warning: {request.method} {request.path} ran {g.query_count} queries (budget {QUERY_BUDGET})")
+
+    # Streamed responses (the CSV export) are timed up to the start of the body
+    response.headers.add("Server-Timing", f'db;dur={g.query_time * 1000:.1f};desc="{g.query_count} queries"')
+    response.headers.add("Server-Timing", f"storage;dur={g.storage_time * 1000:.1f}")
+    response.headers.add("Server-Timing", f"total;dur={elapsed * 1000:.1f}")
+    return response
@@ -1,9 +1,26 @@
 from rpmt import db, login_manager
+from rpmt.user_cache import user_cache
 from flask_login import UserMixin
+from sqlalchemy.orm import make_transient_to_detached
+from datetime import datetime
+
+# Function to get a user, from the user cache when possible
+# A cached user is rebuilt from its column values and attached to the session without a query, so
+# it can still be changed, deleted or have its projects loaded like a user read from the database
+def get_user(user_id):
+    values = user_cache.get(user_id)
+    if values is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            user_cache.set(user_id, {column: getattr(user, column) for column in User.__table__.columns.keys()})
+        return user
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return get_user(int(user_id))
 
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
@@ -20,6 +37,7 @@ class Author(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(128), unique=True, nullable=False)
     projects = db.relationship('AuthorProject', backref='author', lazy=True)
+    __table_args__ = (db.Index('ix_author_name_lower', db.func.lower(name)),)
     
     def __repr__(self):
         return f"Author {self.id}: {self.name}"
@@ -28,6 +46,7 @@ class Editor(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(128), unique=True, nullable=False)
     projects = db.relationship('EditorProject', backref='editor', lazy=True)
+    __table_args__ = (db.Index('ix_editor_name_lower', db.func.lower(name)),)
     
     def __repr__(self):
         return f"Editor {self.id}: {self.name}"
@@ -35,16 +54,20 @@ class Editor(db.Model):
 class AuthorProject(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     author_id = db.Column(db.Integer, db.ForeignKey('author.id'), nullable=False)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id', name='fk_author_project_id', ondelete='CASCADE'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', name='fk_author_project_id', ondelete='CASCADE'), nullable=False, index=True)
+    # Also serves as the author_id index
+    __table_args__ = (db.UniqueConstraint('author_id', 'project_id', name='uq_author_project'),)
     
 class EditorProject(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     editor_id = db.Column(db.Integer, db.ForeignKey('editor.id'), nullable=False)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id', name='fk_editor_project_id', ondelete='CASCADE'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', name='fk_editor_project_id', ondelete='CASCADE'), nullable=False, index=True)
+    # Also serves as the editor_id index
+    __table_args__ = (db.UniqueConstraint('editor_id', 'project_id', name='uq_editor_project'),)
 
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    creator_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    creator_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     title = db.Column(db.String(300), nullable=False)
     authors = db.relationship('AuthorProject', backref='project', lazy=True, cascade="all, delete")
     abstract = db.Column(db.String(1000), nullable=False)
@@ -68,6 +91,30 @@ class Project(db.Model):
     publication_proof = db.Column(db.String(300), nullable=False)
     utilization_proof = db.Column(db.String(300), nullable=False)
     pdf = db.Column(db.String(300), nullable=False)
+    # Matches the (date_published, id) keyset ordering of the project lists
+    __table_args__ = (db.Index('ix_project_date_published_id', 'date_published', 'id'),)
     
     def __repr__(self):
-        return f"Project {self.id}: {self.title}"
\ No newline at end of file
+        return f"Project {self.id}: {self.title}"
+
+class FileDeletion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(300), nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    last_error = db.Column(db.String(500))
+    created = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"FileDeletion {self.id}: {self.filename} ({self.attempts} attempts)"
+
+class Attachment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(300), unique=True, nullable=False)
+    reference_count = db.Column(db.Integer, nullable=False, default=0)
+    created = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Set by the file deleter when it removes the file from storage, see rpmt/deletions.py
+    deleting_since = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"Attachment {self.id}: {self.filename} ({self.reference_count} references)"
@@ -0,0 +1,96 @@
+from rpmt import db
+from rpmt.models import Author, Editor, AuthorProject, EditorProject
+from rpmt.inserts import insert_ignoring_conflicts
+from sqlalchemy import insert, delete, exists, func
+
+# Author and Editor Names
+# ----------------------------------------------------------------------------------------------
+# Names are resolved to ids with one IN query on lower(name), which the ix_author_name_lower and
+# ix_editor_name_lower indexes serve, so "juan dela cruz" links the existing "Juan Dela Cruz"
+# instead of adding a second author. The missing ones are bulk inserted with ON CONFLICT DO NOTHING
+# so concurrent submissions of a new name cannot trip the unique constraint.
+# Nothing here commits; the caller writes the project and its links in a single transaction.
+
+# Function to split the comma separated form input into unique names, keeping their order
+def split_names(data):
+    names = []
+    seen = set()
+    for name in (data or "").split(', '):
+        name = name.strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+def insert_names(model, names):
+    insert_ignoring_conflicts(model, [{"name": name} for name in names], 'name')
+
+# Returns a name -> id mapping for every name, creating the names that do not exist yet
+# SQLite only lowercases ASCII letters, names that differ in other letters are matched exactly
+def resolve_names(model, names):
+    if not names:
+        return {}
+    lower_ids = {}
+    for lower_name, name_id in db.session.query(func.lower(model.name), model.id) \
+                                         .filter(func.lower(model.name).in_([name.lower() for name in names])) \
+                                         .order_by(model.id):
+        lower_ids.setdefault(lower_name, name_id)
+    ids = {name: lower_ids[name.lower()] for name in names if name.lower() in lower_ids}
+    missing = [name for name in names if name not in ids]
+    if missing:
+        insert_names(model, missing)
+        ids.update(db.session.query(model.name, model.id).filter(model.name.in_(missing)))
+    return ids
+
+def add_links(model, link_model, link_column, project_id, names):
+    add_project_links(model, link_model, link_column, {project_id: names})
+
+# Links the names of several projects at once, resolving every name in one go (bulk import)
+def add_project_links(model, link_model, link_column, names_by_project):
+    ids = resolve_names(model, list(dict.fromkeys(name for names in names_by_project.values() for name in names)))
+    rows = [{link_column: ids[name], "project_id": project_id}
+            for project_id, names in names_by_project.items() for name in names]
+    if rows:
+        db.session.execute(insert(link_model), rows)
+
+# Only inserts and deletes the links whose names changed, and returns the previous names
+def sync_links(model, link_model, link_column, project_id, names):
+    current = db.session.query(link_model.id, model.name) \
+                        .join(model, model.id == getattr(link_model, link_column)) \
+                        .filter(link_model.project_id == project_id) \
+                        .order_by(link_model.id).all()
+    current_names = [name for _, name in current]
+    # Compared ignoring case like resolve_names, retyping a name in other case keeps its link
+    lower_names = {name.lower() for name in names}
+    lower_current = {name.lower() for name in current_names}
+    removed = [link_id for link_id, name in current if name.lower() not in lower_names]
+    added = [name for name in names if name.lower() not in lower_current]
+    if removed:
+        db.session.query(link_model).filter(link_model.id.in_(removed)).delete(synchronize_session=False)
+    add_links(model, link_model, link_column, project_id, added)
+    return current_names
+
+def add_author_links(project_id, names):
+    add_links(Author, AuthorProject, 'author_id', project_id, names)
+
+def add_editor_links(project_id, names):
+    add_links(Editor, EditorProject, 'editor_id', project_id, names)
+
+def sync_author_links(project_id, names):
+    return sync_links(Author, AuthorProject, 'author_id', project_id, names)
+
+def sync_editor_links(project_id, names):
+    return sync_links(Editor, EditorProject, 'editor_id', project_id, names)
+
+# Orphan Sweep
+# ----------------------------------------------------------------------------------------------
+# Authors and editors left without any project are removed with one anti-join DELETE per table.
+def delete_orphan_names():
+    deleted_authors = db.session.execute(
+        delete(Author).where(~exists().where(AuthorProject.author_id == Author.id))
+    ).rowcount
+    deleted_editors = db.session.execute(
+        delete(Editor).where(~exists().where(EditorProject.editor_id == Editor.id))
+    ).rowcount
+    db.session.commit()
+    return deleted_authors, deleted_editors
@@ -0,0 +1,94 @@
+from rpmt.models import Project
+from sqlalchemy import tuple_
+from datetime import date
+
+# Keyset Pagination
+# ----------------------------------------------------------------------------------------------
+# Project lists are ordered newest first on (date_published, id) and paged with seek cursors
+# instead of OFFSET, so every page costs the same no matter how deep into the table it is.
+# Search results are paged the same way on (rank, id), best match first.
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+class ProjectPage:
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None, args=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        # Extra query parameters the page links keep, e.g. the search terms
+        self.args = args or {}
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+def encode_cursor(row):
+    return f"{row.date_published.isoformat()}_{row.id}"
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        date_string, project_id = cursor.split('_')
+        return date.fromisoformat(date_string), int(project_id)
+    except ValueError:
+        return None
+
+# Search results are ordered best match first on (rank, id), repr() keeps the float rank exact
+def encode_search_cursor(row):
+    return f"{row.rank!r}_{row.id}"
+
+def decode_search_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        rank, project_id = cursor.rsplit('_', 1)
+        return float(rank), int(project_id)
+    except ValueError:
+        return None
+
+def get_page_size(per_page):
+    if not per_page or per_page < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(per_page, MAX_PAGE_SIZE)
+
+# Fetches the page after or before a cursor on the key columns, in descending or ascending key order
+def seek_page(query, key_columns, descending, encode, after, before, per_page, args=None):
+    key = tuple_(*key_columns)
+    forward = [column.desc() if descending else column.asc() for column in key_columns]
+    backward = [column.asc() if descending else column.desc() for column in key_columns]
+
+    if before:
+        # Walk backwards from the cursor, then flip the rows back into page order
+        rows = query.filter(key > before if descending else key < before) \
+                    .order_by(*backward).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        rows.reverse()
+        next_cursor = encode(rows[-1]) if rows else None
+        prev_cursor = encode(rows[0]) if rows and has_more else None
+    else:
+        if after:
+            query = query.filter(key < after if descending else key > after)
+        rows = query.order_by(*forward).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        next_cursor = encode(rows[-1]) if rows and has_more else None
+        prev_cursor = encode(rows[0]) if rows and after else None
+
+    return ProjectPage(rows, per_page, next_cursor, prev_cursor, args)
+
+def paginate_projects(query, after=None, before=None, per_page=DEFAULT_PAGE_SIZE):
+    # Only load the columns the list pages show
+    query = query.with_entities(Project.id, Project.title, Project.date_published)
+    return seek_page(query, [Project.date_published, Project.id], True, encode_cursor,
+                     decode_cursor(after), decode_cursor(before), get_page_size(per_page))
+
+# Pages a query joined to the search matches (see search_projects_query), best match first
+def paginate_search(query, rank, after=None, before=None, per_page=DEFAULT_PAGE_SIZE, args=None):
+    query = query.with_entities(Project.id, Project.title, rank.label("rank"))
+    return seek_page(query, [rank, Project.id], False, encode_search_cursor,
+                     decode_search_cursor(after), decode_search_cursor(before), get_page_size(per_page), args)
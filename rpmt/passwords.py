@@ -0,0 +1,136 @@
+from password_hashing import make_hash, check_hash
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+import multiprocessing
+import threading
+import time
+import os
+
+# Password Hashing
+# ----------------------------------------------------------------------------------------------
+# bcrypt takes 100-300 ms of CPU per password on purpose. Running it on the server threads holds the
+# GIL, so a burst of logins slows every other page down. Hashes are computed in a pool of
+# PASSWORD_WORKERS processes instead (0 hashes on the calling thread), with at most PASSWORD_QUEUE
+# requests waiting for it. A request that can't get a place within PASSWORD_QUEUE_TIMEOUT seconds
+# gets PasswordBusy. BCRYPT_ROUNDS is the work factor for new hashes. Passwords hashed with another
+# factor are rehashed the next time their user logs in.
+# The pool runs make_hash/check_hash from password_hashing.py, which doesn't import the app.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+class PasswordBusy(Exception):
+    pass
+
+class PasswordHasher:
+    def __init__(self, rounds, workers, max_pending, timeout):
+        self.rounds = rounds
+        self.workers = workers
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.executor = None
+
+    # The pool is started on first use, so CLI scripts and server startup don't pay for it
+    # Spawned processes work the same on Windows (RPMT.exe) and don't copy the server threads
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                    mp_context=multiprocessing.get_context("spawn"))
+            return self.executor
+
+    def run(self, function, *args):
+        if self.workers == 0:
+            return function(*args)
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PasswordBusy()
+        try:
+            return self.get_executor().submit(function, *args).result()
+        except BrokenProcessPool:
+            # A pool process died, start a new pool on the next call
+            with self.lock:
+                self.executor = None
+            raise
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        return self.run(make_hash, password, self.rounds)
+
+    def check(self, password_hash, password):
+        return self.run(check_hash, password_hash, password)
+
+    # Hashes look like $2b$12$..., the number being the work factor
+    def needs_rehash(self, password_hash):
+        parts = password_hash.split('$')
+        return len(parts) < 4 or not parts[2].isdigit() or int(parts[2]) != self.rounds
+
+password_hasher = PasswordHasher(
+    rounds=BCRYPT_ROUNDS,
+    workers=int(os.getenv("PASSWORD_WORKERS", min(2, os.cpu_count() or 1))),
+    max_pending=int(os.getenv("PASSWORD_QUEUE", 8)),
+    timeout=int(os.getenv("PASSWORD_QUEUE_TIMEOUT", 5))
+)
+
+# Login Rate Limiting
+# ----------------------------------------------------------------------------------------------
+# Counts attempts per key in a sliding window, so nobody can keep the password pool busy or guess
+# passwords quickly. Limits are per server process.
+MAX_TRACKED_KEYS = 10000
+
+class RateLimiter:
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.attempts = {}
+        self.lock = threading.Lock()
+        self.next_prune = 0
+
+    # Records an attempt and returns False when the key already used up its attempts
+    def allow(self, key):
+        now = time.monotonic()
+        with self.lock:
+            # Drop keys whose attempts all expired, at most once per window, so the table doesn't grow forever
+            if len(self.attempts) > MAX_TRACKED_KEYS and now >= self.next_prune:
+                for stale in [k for k, times in self.attempts.items() if not times or times[-1] <= now - self.window]:
+                    del self.attempts[stale]
+                self.next_prune = now + self.window
+            times = self.attempts.setdefault(key, deque())
+            while times and times[0] <= now - self.window:
+                times.popleft()
+            if len(times) >= self.limit:
+                return False
+            times.append(now)
+            return True
+
+    # Takes back the latest attempt of the key
+    def refund(self, key):
+        with self.lock:
+            times = self.attempts.get(key)
+            if times:
+                times.pop()
+
+    def reset(self, key):
+        with self.lock:
+            self.attempts.pop(key, None)
+
+LOGIN_RATE_WINDOW = int(os.getenv("LOGIN_RATE_WINDOW", 300))
+# Attempts per LOGIN_RATE_WINDOW seconds from one address, and for one username from one address.
+# The username limit is kept per address so failed attempts from elsewhere can't lock its owner out.
+address_limiter = RateLimiter(int(os.getenv("LOGIN_RATE_LIMIT", 20)), LOGIN_RATE_WINDOW)
+username_limiter = RateLimiter(int(os.getenv("LOGIN_USER_RATE_LIMIT", 10)), LOGIN_RATE_WINDOW)
+
+def username_key(address, username):
+    return (username.lower(), address)
+
+def allow_password_attempt(address, username=None):
+    allowed = address_limiter.allow(address)
+    if username:
+        allowed = username_limiter.allow(username_key(address, username)) and allowed
+    return allowed
+
+# Called once the password turned out right. Only wrong passwords count against the address, so
+# many users logging in from behind one shared address (campus NAT) don't use up its limit.
+def reset_password_attempts(address, username):
+    address_limiter.refund(address)
+    username_limiter.reset(username_key(address, username))
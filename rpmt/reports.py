@@ -0,0 +1,181 @@
+from rpmt import db
+from rpmt.models import Project, Author, Editor, AuthorProject, EditorProject
+from rpmt.stamped_cache import StampedCache
+from sqlalchemy import select, func, case
+from io import StringIO
+import tempfile
+import zlib
+import csv
+import os
+
+# Projects Report
+# ----------------------------------------------------------------------------------------------
+# The whole report is one query: authors and editors are folded into comma separated strings by
+# grouped group_concat/string_agg subqueries joined onto the projects, instead of issuing two extra
+# queries per project.
+REPORT_FIELDS = [
+    "title", "date_published", "authors", "doi_url", "citations", "publication_name",
+    "publisher", "publisher_type", "publisher_location", "vol_issue_no", "editors",
+    "isbn_issn", "web_of_science", "elsevier_scopus", "elsevier_sciencedirect",
+    "pubmed_medline", "ched_recognized", "other_database"
+]
+REPORT_BATCH_SIZE = 500
+INDEXING_DATABASES = [
+    "web_of_science", "elsevier_scopus", "elsevier_sciencedirect", "pubmed_medline", "ched_recognized"
+]
+
+def filter_report(query, author=None, start_date=None, end_date=None):
+    if author:
+        matching_projects = select(AuthorProject.project_id) \
+            .join(Author, Author.id == AuthorProject.author_id) \
+            .where(Author.name.ilike(f"%{author}%"))
+        query = query.where(Project.id.in_(matching_projects))
+    if start_date:
+        query = query.where(Project.date_published >= start_date)
+    if end_date:
+        query = query.where(Project.date_published <= end_date)
+    return query
+
+def report_query(author=None, start_date=None, end_date=None):
+    author_names = select(AuthorProject.project_id, func.aggregate_strings(Author.name, ', ').label("names")) \
+        .join(Author, Author.id == AuthorProject.author_id) \
+        .group_by(AuthorProject.project_id) \
+        .subquery()
+    editor_names = select(EditorProject.project_id, func.aggregate_strings(Editor.name, ', ').label("names")) \
+        .join(Editor, Editor.id == EditorProject.editor_id) \
+        .group_by(EditorProject.project_id) \
+        .subquery()
+
+    columns = []
+    for field in REPORT_FIELDS:
+        if field == "authors":
+            columns.append(func.coalesce(author_names.c.names, '').label("authors"))
+        elif field == "editors":
+            columns.append(func.coalesce(editor_names.c.names, '').label("editors"))
+        else:
+            columns.append(getattr(Project, field))
+    query = select(*columns) \
+        .outerjoin(author_names, author_names.c.project_id == Project.id) \
+        .outerjoin(editor_names, editor_names.c.project_id == Project.id)
+
+    query = filter_report(query, author, start_date, end_date)
+    return query.order_by(Project.date_published, Project.id)
+
+# Publication count and citation total per author, limited to the searched authors if any
+def author_summary_query(author=None, start_date=None, end_date=None):
+    query = select(
+        Author.name,
+        func.count(Project.id.distinct()).label("project_count"),
+        func.coalesce(func.sum(Project.citations), 0).label("citations")
+    ).join(AuthorProject, AuthorProject.author_id == Author.id) \
+     .join(Project, Project.id == AuthorProject.project_id)
+    if author:
+        query = query.where(Author.name.ilike(f"%{author}%"))
+    query = filter_report(query, None, start_date, end_date)
+    return query.group_by(Author.id, Author.name) \
+                .order_by(func.count(Project.id.distinct()).desc(), Author.name)
+
+# Totals over the whole report plus the number of projects in each indexing database
+def database_summary_query(author=None, start_date=None, end_date=None):
+    columns = [
+        func.count(Project.id).label("project_count"),
+        func.coalesce(func.sum(Project.citations), 0).label("citations")
+    ]
+    for database in INDEXING_DATABASES:
+        column = getattr(Project, database)
+        columns.append(func.coalesce(func.sum(case((column, 1), else_=0)), 0).label(database))
+    columns.append(func.coalesce(func.sum(case((Project.other_database != '', 1), else_=0)), 0).label("other_database"))
+    return filter_report(select(*columns), author, start_date, end_date)
+
+def get_report_rows(author=None, start_date=None, end_date=None):
+    return [dict(row) for row in db.session.execute(report_query(author, start_date, end_date)).mappings()]
+
+def get_report(author=None, start_date=None, end_date=None):
+    return {
+        "projects": get_report_rows(author, start_date, end_date),
+        "authors": [dict(row) for row in db.session.execute(author_summary_query(author, start_date, end_date)).mappings()],
+        "summary": dict(db.session.execute(database_summary_query(author, start_date, end_date)).mappings().one())
+    }
+
+# Report Cache
+# ----------------------------------------------------------------------------------------------
+# Report results keyed on the normalized search inputs, see rpmt/stamped_cache.py for eviction and
+# how other processes (server workers, import_projects.py) are told through REPORT_CACHE_STAMP.
+# Saving or deleting a project only drops the cached reports here whose date range and author
+# filter that project falls under.
+class ReportCache(StampedCache):
+    def __init__(self, stamp_path, max_entries=32, ttl=600):
+        super().__init__(stamp_path, max_entries, ttl)
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(author=None, start_date=None, end_date=None):
+        author = ' '.join((author or '').split()).lower() or None
+        return (author, start_date, end_date)
+
+    # Drop the cached reports that could contain a project published on one of the given dates
+    # and credited to one of the given author names
+    def invalidate(self, dates, author_names):
+        author_names = [name.lower() for name in author_names]
+
+        def affected(key):
+            author, start_date, end_date = key
+            in_range = any(
+                (start_date is None or start_date <= published) and (end_date is None or published <= end_date)
+                for published in dates if published
+            )
+            return in_range and (author is None or any(author in name for name in author_names))
+
+        removed = self.invalidate_where(affected)
+        with self.lock:
+            self.invalidations += removed
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations
+            }
+
+report_cache = ReportCache(
+    stamp_path=os.getenv("REPORT_CACHE_STAMP", os.path.join(tempfile.gettempdir(), "rpmt-report-cache.stamp")),
+    max_entries=int(os.getenv("REPORT_CACHE_SIZE", 32)),
+    ttl=int(os.getenv("REPORT_CACHE_TTL", 600))
+)
+
+def get_cached_report(author=None, start_date=None, end_date=None):
+    key = ReportCache.make_key(author, start_date, end_date)
+    report = report_cache.get(key)
+    if report is None:
+        report = get_report(*key)
+        report_cache.set(key, report)
+    return report
+
+def get_author_names(project_id):
+    return [name for name, in db.session.query(Author.name)
+                                     .join(AuthorProject, AuthorProject.author_id == Author.id)
+                                     .filter(AuthorProject.project_id == project_id)]
+
+# Streams the report as CSV text, one chunk per batch of rows fetched from a server-side cursor
+def iter_report_csv(author=None, start_date=None, end_date=None, batch_size=REPORT_BATCH_SIZE):
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=REPORT_FIELDS)
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    query = report_query(author, start_date, end_date).execution_options(yield_per=batch_size)
+    for rows in db.session.execute(query).mappings().partitions():
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
@@ -1,13 +1,28 @@
-from flask import render_template, flash, redirect, url_for, request
+from flask import render_template, flash, redirect, url_for, request, Response, stream_with_context, jsonify, send_file, abort
 from flask_login import login_user, current_user, logout_user, login_required
-from rpmt import app, db, bcrypt, upload_file, delete_file, get_file_url
-from rpmt.forms import LoginForm, ProjectForm, SearchForm, UserForm
-from rpmt.models import User, Project, Author, Editor, AuthorProject, EditorProject
-import time
+from rpmt import app, db, storage, upload_files, get_file_url, file_exists
+from rpmt.file_cache import attachment_cache
+from rpmt.forms import LoginForm, ProjectForm, SearchForm, UserForm, ImportForm
+from rpmt.models import User, Project, get_user
+from rpmt.user_cache import user_cache
+from rpmt.passwords import password_hasher, PasswordBusy, allow_password_attempt, reset_password_attempts
+from rpmt.pagination import paginate_projects, paginate_search
+from rpmt.search import search_projects_query, index_project, remove_project
+from rpmt.names import split_names, add_author_links, add_editor_links, sync_author_links, sync_editor_links
+from rpmt.tasks import orphan_sweeper, file_deleter
+from rpmt.deletions import enqueue_file_deletions
+from rpmt.attachments import read_attachment, missing_attachments, acquire_attachments, release_attachments, PLACEHOLDER_FILES
+from rpmt.images import make_renditions, is_image, rendition_filename, RENDITIONS
+from rpmt.chunked_uploads import chunked_uploads, claim_chunked_uploads, UploadError
+from flask_wtf.csrf import validate_csrf
+from wtforms.validators import ValidationError
+from urllib.parse import unquote
+from rpmt.importer import import_projects
+from rpmt.metrics import render_metrics
+import hmac
+from rpmt.reports import get_cached_report, iter_report_csv, gzip_chunks, report_cache, get_author_names
 import os
-import requests
-import csv
-from io import StringIO
+from datetime import date
 
 # Home Page
 # ----------------------------------------------------------------------------------------------
@@ -18,38 +33,64 @@ def home():
 
 # Projects Page
 # ----------------------------------------------------------------------------------------------
+# Function to get one page of a project listing from the cursor/page size query parameters
+def get_project_page(query):
+    return paginate_projects(
+        query,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=request.args.get('per_page', type=int)
+    )
+
+# The search terms come from the posted form, and from the query parameters on the pages after it
+def get_search_form():
+    if request.method == 'POST':
+        return SearchForm()
+    return SearchForm(formdata=None, title=request.args.get('title'), author=request.args.get('author'))
+
+# Function to get one page of the projects matching the search form, best match first, or of the
+# whole listing when the form is empty or nothing matched
+def get_search_page(projects, form):
+    title = form.title.data or None
+    author = form.author.data or None
+    if not title and not author:
+        return get_project_page(projects)
+    matches, rank = search_projects_query(projects, title=title, author=author)
+    page = paginate_search(
+        matches, rank,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=request.args.get('per_page', type=int),
+        args={name: value for name, value in [('title', title), ('author', author)] if value}
+    )
+    if not page.items and request.method == 'POST':
+        flash('This project does not exist. Please check if there are any mistakes.', 'danger')
+        return get_project_page(projects)
+    return page
+
 @app.get("/projects/")
 def project_list():
-    form = SearchForm()
-    projects = Project.query.all()
-    return render_template("projectlist.html", data=projects, mode="View", form=form)
+    form = get_search_form()
+    projects = get_search_page(Project.query, form)
+    return render_template("projectlist.html", data=projects, page=projects, mode="View", form=form)
 
 @app.post("/projects/")
 def search_projects():
-    form = SearchForm()
-    projects = Project.query
-    
-    if form.title.data:
-        search_term = f"%{form.title.data}%"
-        projects = projects.filter(Project.title.ilike(search_term))
-        
-    if form.author.data:
-        author_search_term = f"%{form.author.data}%"
-        projects = projects.join(AuthorProject).join(Author).filter(Author.name.ilike(author_search_term))
-
-    if projects.all() == []:
-        flash('This project does not exist. Please check if there are any mistakes.', 'danger')
-        projects = Project.query.all()
-    return render_template("projectlist.html", data=projects, mode="View", form=form)
+    return project_list()
 
 @app.get("/projects/<int:paper_id>")
 def project_page(paper_id):
     project = Project.query.filter_by(id=paper_id).first()
-    creator = User.query.filter_by(id=project.creator_id).first()
+    creator = get_user(project.creator_id)
     creator_name = creator.username
     authors_data = ', '.join([ap.author.name for ap in project.authors])
     editors_data = ', '.join([ep.editor.name for ep in project.editors])
-    return render_template("projectpage.html", project=project, creator=creator_name, authors=authors_data, editors=editors_data)
+    # Proof images are shown as thumbnails linking to their display size copy
+    proof_images = [(label, filename) for label, filename in [("Proof of Publication", project.publication_proof),
+                                                              ("Proof of Utilization", project.utilization_proof)]
+                    if is_image(filename) and filename not in PLACEHOLDER_FILES]
+    return render_template("projectpage.html", project=project, creator=creator_name, authors=authors_data, editors=editors_data,
+                           proof_images=proof_images)
 
 @app.get('/download/<filename>')
 def download_file(filename):
@@ -59,13 +100,25 @@ def download_file(filename):
         return redirect(url_for('project_list'))
     else:
         try:
-            # Use Supabase client to get a signed URL
+            # Files kept on this machine are served directly
+            path = storage.local_path(filename)
+            if path:
+                return send_file(path, download_name=filename, conditional=True, max_age=3600)
+
+            # Serve from the local attachment cache when it is enabled
+            cached = attachment_cache.get(filename) if attachment_cache.enabled else None
+            if cached:
+                path, content_hash, cached_time = cached
+                return send_file(path, download_name=filename, etag=content_hash,
+                                 last_modified=cached_time, conditional=True, max_age=3600)
+
+            # Send the browser straight to storage, which also serves Range requests for large PDFs
             url = get_file_url(filename)
 
-            # Fetch the file from the signed URL
-            file_response = requests.get(url)
-            
-            if file_response.status_code == 200:
+            if url and file_exists(filename, url):
+                # A cache miss is filled in the background for the next download
+                if attachment_cache.enabled:
+                    attachment_cache.fetch_later(filename, url)
                 return redirect(url, code=302)
             else:
                 flash('Failed to download file. Please try again.', 'danger')
@@ -74,6 +127,40 @@ def download_file(filename):
             flash(f'An error occurred: {str(e)}. Please contact the admin or developers if this persists.', 'danger')
             return redirect(url_for('project_list'))
 
+# Display and thumbnail copies of proof images, see rpmt/images.py
+@app.get('/images/<rendition>/<filename>')
+def image_rendition(rendition, filename):
+    if rendition not in RENDITIONS or not is_image(filename) or filename in PLACEHOLDER_FILES:
+        abort(404)
+    rendition_name = rendition_filename(filename, rendition)
+    url = get_file_url(rendition_name)
+    if url and file_exists(rendition_name, url):
+        return redirect(url, code=302)
+    # Images uploaded before renditions were made (or without Pillow) only have the original
+    return redirect(url_for('download_file', filename=filename), code=302)
+
+# Local storage backend files, see get_file_url
+@app.get('/files/<filename>')
+def local_file(filename):
+    path = storage.local_path(filename)
+    if not path:
+        abort(404)
+    return send_file(path, download_name=filename, conditional=True, max_age=3600)
+
+# Metrics
+# ----------------------------------------------------------------------------------------------
+# Prometheus scrape endpoint, see rpmt/metrics.py. Only answered on this machine unless
+# METRICS_TOKEN is set, in which case it has to be sent as a bearer token instead.
+@app.get("/metrics")
+def metrics():
+    token = os.getenv("METRICS_TOKEN")
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+            abort(401)
+    elif request.remote_addr not in ('127.0.0.1', '::1'):
+        abort(404)
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
 # Admin: Register Page
 # ----------------------------------------------------------------------------------------------
 @app.get("/register")
@@ -97,8 +184,15 @@ def register_post():
         if user:
             flash('Username already exists. Please choose a different one.', 'danger')
             return render_template("register.html", form=form)
-        
-        hashed_password = bcrypt.generate_password_hash(password).decode("utf-8")
+
+        if not allow_password_attempt(request.remote_addr):
+            flash('Too many attempts. Please wait a few minutes and try again.', 'danger')
+            return render_template("register.html", form=form), 429
+        try:
+            hashed_password = password_hasher.hash(password)
+        except PasswordBusy:
+            flash('The server is busy, please try again in a moment.', 'warning')
+            return render_template("register.html", form=form), 503
 
         user = User(username=username, email=email, password=hashed_password, role=role)
 
@@ -125,18 +219,44 @@ def login():
 def login_post():
     form = LoginForm()
     if form.validate_on_submit():
+        # Checked before the password so guessing can't keep the password workers busy
+        if not allow_password_attempt(request.remote_addr, form.username.data):
+            flash('Too many login attempts. Please wait a few minutes and try again.', 'danger')
+            return render_template("login.html", form=form), 429
+
         user = User.query.filter_by(username=form.username.data).first()
         
         # Login logic (checking username-password pair)
-        if user and bcrypt.check_password_hash(user.password, form.password.data):
+        try:
+            valid = user is not None and password_hasher.check(user.password, form.password.data)
+        except PasswordBusy:
+            flash('The server is busy, please try logging in again in a moment.', 'warning')
+            return render_template("login.html", form=form), 503
+
+        if valid:
+            reset_password_attempts(request.remote_addr, form.username.data)
             login_user(user, remember=form.remember.data)
             flash(f'Logged in as {user.username}.', 'success')
+            rehash_password(user, form.password.data)
             next_page = request.args.get('next')
             return redirect(next_page) if next_page else redirect(url_for('home'))
         else:
             flash('Login unsuccessful, please check your credentials.', 'danger')
     return render_template("login.html", form=form)
 
+# Function to rehash a password saved with an older BCRYPT_ROUNDS while the plain password is known
+def rehash_password(user, password):
+    if not password_hasher.needs_rehash(user.password):
+        return
+    try:
+        user.password = password_hasher.hash(password)
+        user_id = user.id
+        db.session.commit()
+        user_cache.invalidate(user_id)
+    except PasswordBusy:
+        # Tried again on the next login
+        db.session.rollback()
+
 # Logout
 # ----------------------------------------------------------------------------------------------
 @app.route("/logout")
@@ -151,14 +271,6 @@ def logout():
 @app.get("/admin/")
 @login_required
 def admin():
-    # Check author and editor list to ensure no empty authors/editors
-    for author in Author.query.all():
-        if author.projects == []:
-            db.session.delete(author)
-    for editor in Editor.query.all():
-        if editor.projects == []:
-            db.session.delete(editor)
-    db.session.commit()
     return render_template("admin.html")
 
 # Admin: Generate Projects Report
@@ -174,87 +286,45 @@ def report():
 @login_required
 def search_report():
     form = SearchForm()
-    projects = []
-    combined_data = []
+    report_data = get_cached_report(
+        author=form.author.data,
+        start_date=form.start_date.data,
+        end_date=form.end_date.data
+    )
 
-    if form.author.data:
-        author_search_term = f"%{form.author.data}%"
-        authors = Author.query.filter(Author.name.ilike(author_search_term)).all()
-        author_ids = [author.id for author in authors]
-        
-        # Filter projects based on the selected authors
-        projects = Project.query.join(AuthorProject).filter(AuthorProject.author_id.in_(author_ids)).all()
-    else:
-    # If no author filter, include all projects
-        projects = Project.query.all()
-
-    if form.start_date.data and form.end_date.data:
-        start_date = form.start_date.data
-        end_date = form.end_date.data
-        projects = Project.query.filter(Project.date_published.between(start_date, end_date)).all()
-
-    for project in projects:
-        # Collect authors
-        author_names = [author.name for author in Author.query.join(AuthorProject).filter(AuthorProject.project_id == project.id).all()]
-        author_list = ", ".join(author_names)
-
-        # Collect editors
-        editor_names = [editor.name for editor in Editor.query.join(EditorProject).filter(EditorProject.project_id == project.id).all()]
-        editor_list = ", ".join(editor_names)
-
-        # Collect project details
-        project_data = {
-            "title": project.title,
-            "date_published": project.date_published,
-            "authors": author_list,
-            "doi_url": project.doi_url,
-            "citations": project.citations,
-            "publication_name": project.publication_name,
-            "publisher": project.publisher,
-            "publisher_type": project.publisher_type,
-            "publisher_location": project.publisher_location,
-            "vol_issue_no": project.vol_issue_no,
-            "editors": editor_list,
-            "isbn_issn": project.isbn_issn,
-            "web_of_science": project.web_of_science,
-            "elsevier_scopus": project.elsevier_scopus,
-            "elsevier_sciencedirect": project.elsevier_sciencedirect,
-            "pubmed_medline": project.pubmed_medline,
-            "ched_recognized": project.ched_recognized,
-            "other_database": project.other_database
-        }
-        combined_data.append(project_data)
-
-    # Save combined data as CSV
-    csv_buffer = StringIO()
-    fieldnames = [
-        "title", "date_published", "authors", "doi_url", "citations", "publication_name", 
-        "publisher", "publisher_type", "publisher_location", "vol_issue_no", "editors", 
-        "isbn_issn", "web_of_science", "elsevier_scopus", "elsevier_sciencedirect", 
-        "pubmed_medline", "ched_recognized", "other_database"
-    ]
-    writer = csv.DictWriter(csv_buffer, fieldnames=fieldnames)
-    writer.writeheader()
-    for row in combined_data:
-        writer.writerow(row)
-    
-    csv_buffer.seek(0)
+    if not report_data["projects"]:
+        flash('No results found. Please check if there are any mistakes.', 'danger')
 
-    # Delete existing file and upload new CSV
-    delete_file('report.csv')
-    upload_file('report.csv', csv_buffer)
+    return render_template("report.html", form=form, projects=report_data["projects"],
+                           authors=report_data["authors"], summary=report_data["summary"])
 
-    if not projects:
-        flash('No results found. Please check if there are any mistakes.', 'danger')
+@app.get("/admin/report.csv")
+@login_required
+def export_report():
+    chunks = iter_report_csv(
+        author=request.args.get('author'),
+        start_date=request.args.get('start_date', type=date.fromisoformat),
+        end_date=request.args.get('end_date', type=date.fromisoformat)
+    )
+    headers = {"Content-Disposition": "attachment; filename=report.csv", "Vary": "Accept-Encoding"}
 
-    return render_template("report.html", form=form, projects=projects)
+    # Compress on the fly for clients that accept it, caches keep both versions apart by the Vary header
+    if request.accept_encodings['gzip']:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return Response(stream_with_context(chunks), mimetype="text/csv", headers=headers)
+
+@app.get("/admin/report/cache")
+@login_required
+def report_cache_stats():
+    return jsonify(report_cache.stats())
 
 # Admin: Manage Account
 # ----------------------------------------------------------------------------------------------
 @app.get("/account/")
 @login_required
 def manage_account():
-    user = User.query.filter_by(username=current_user.username).first()
+    user = current_user
     form = UserForm(
         username=user.username,
         email=user.email,
@@ -263,36 +333,48 @@ def manage_account():
     return render_template("userpage.html", user=user, form=form)
 
 @app.post("/account/")
+@login_required
 def edit_credentials():
-    user = User.query.filter_by(username=current_user.username).first()
+    user = current_user
     form = UserForm()
     if form.validate_on_submit():
+        if not allow_password_attempt(request.remote_addr, user.username):
+            flash('Too many attempts. Please wait a few minutes and try again.', 'danger')
+            return redirect(url_for('manage_account'))
         try:
-            if bcrypt.check_password_hash(user.password, form.password.data):
+            if password_hasher.check(user.password, form.password.data):
+                reset_password_attempts(request.remote_addr, user.username)
                 user.username = form.username.data
                 user.email = form.email.data
                 if form.new_password.data:
-                    user.password = bcrypt.generate_password_hash(form.new_password.data).decode("utf-8")
+                    user.password = password_hasher.hash(form.new_password.data)
                 user.role = form.role.data
+                user_id = user.id
                 db.session.commit()
+                user_cache.invalidate(user_id)
                 flash('User credentials updated successfully!', 'success')
             else:
                 flash('Please input and confirm your old password.', 'warning')
             return redirect(url_for('manage_account'))
-                
+        
+        except PasswordBusy:
+            db.session.rollback()
+            flash('The server is busy, please try again in a moment.', 'warning')
         except Exception as e:
             db.session.rollback()
             flash(f'An error occurred: {str(e)}. Please contact the admin or developers if this persists.', 'danger')
-            
+    return redirect(url_for('manage_account'))
 
 @app.get("/account/delete")
 @login_required
 def delete_user():
-    user = User.query.filter_by(username=current_user.username).first()
+    user = current_user._get_current_object()
     if user.projects == []:
+        user_id = user.id
         logout_user()
         db.session.delete(user)
         db.session.commit()
+        user_cache.invalidate(user_id)
         flash('User has been deleted.', 'danger')
         return redirect(url_for('home'))
     else: 
@@ -300,6 +382,72 @@ def delete_user():
         flash('Please remove all projects before deleting this user.', 'warning')
         return redirect(url_for('admin'))
 
+# Admin: Chunked Uploads
+# ----------------------------------------------------------------------------------------------
+# Resumable upload API used by the project form for attachments, see rpmt/chunked_uploads.py
+ATTACHMENT_FIELDS = ['publication_proof', 'utilization_proof', 'pdf']
+
+@app.errorhandler(UploadError)
+def upload_error(e):
+    return jsonify(error=str(e)), e.status
+
+# The API is called from JavaScript, so the CSRF token comes in a header instead of a form field
+def check_upload_csrf():
+    if not app.config.get('WTF_CSRF_ENABLED', True):
+        return
+    try:
+        validate_csrf(request.headers.get('X-CSRFToken'))
+    except ValidationError as e:
+        raise UploadError(str(e))
+
+@app.post("/uploads")
+@login_required
+def create_chunked_upload():
+    check_upload_csrf()
+    token = chunked_uploads.create(
+        unquote(request.headers.get('Upload-Filename', '')),
+        request.headers.get('Upload-Length', type=int),
+        current_user.id
+    )
+    return Response(status=201, headers={
+        "Location": url_for('chunked_upload', token=token),
+        "Upload-Token": token,
+        "Upload-Offset": "0"
+    })
+
+# Also answers HEAD requests, which is how a client finds the offset to resume from
+@app.get("/uploads/<token>")
+@login_required
+def chunked_upload(token):
+    info = chunked_uploads.get_info(token, current_user.id)
+    response = jsonify(filename=info["filename"], offset=info["offset"], length=info["length"])
+    response.headers["Upload-Offset"] = str(info["offset"])
+    response.headers["Upload-Length"] = str(info["length"])
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+@app.patch("/uploads/<token>")
+@login_required
+def append_chunked_upload(token):
+    check_upload_csrf()
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset is None:
+        raise UploadError("Upload-Offset is required")
+    offset = chunked_uploads.append(token, current_user.id, offset, request.stream)
+    return Response(status=204, headers={"Upload-Offset": str(offset)})
+
+# Function to use the finished chunked uploads named in the form, returns their tokens or None on error
+def get_chunked_uploads(form):
+    try:
+        return claim_chunked_uploads(form, current_user.id, ATTACHMENT_FIELDS)
+    except UploadError as e:
+        flash(f'{str(e)}. Please attach the file again.', 'danger')
+        return None
+
+def remove_chunked_uploads(tokens):
+    for token in tokens:
+        chunked_uploads.remove(token)
+
 # Admin: Adding Projects
 # ----------------------------------------------------------------------------------------------
 @app.get("/admin/add")
@@ -309,37 +457,75 @@ def add_project():
     form = ProjectForm()
     return render_template("projectform.html", form=form, mode=mode)
 
-# Function to append timestamp to filename to make unique filenames
-def get_filename(filename):
-    timestamp = int(time.time())
-    name, extension = os.path.splitext(filename)
-    return f"{name}_{timestamp}{extension}"
+# Function to add an uploaded file to the pending uploads under its content hash filename
+def add_upload(uploads, file):
+    filename, content = read_attachment(file)
+    uploads.setdefault(filename, content)
+    return filename
+
+# Function to upload attachments concurrently, removing the ones that made it if any upload failed
+# Files already stored for another project are not uploaded again, new images get their renditions
+def upload_attachments(uploads, filenames=None):
+    files = {}
+    for filename in missing_attachments(uploads) if filenames is None else filenames:
+        uploads[filename].seek(0)
+        files[filename] = uploads[filename]
+        files.update(make_renditions(filename, uploads[filename]))
+    statuses = upload_files(files)
+    failed = [filename for filename, uploaded in statuses.items() if not uploaded]
+    if failed:
+        # Renditions are removed together with their original
+        remove_attachments([filename for filename, uploaded in statuses.items() if uploaded and filename in uploads])
+        flash(f'Uploading {", ".join(failed)} failed, nothing was saved. Please try again.', 'danger')
+        return False
+    return True
+
+# Takes the references of the saved files, uploading the ones the file deleter removed meanwhile again
+# (see rpmt/attachments.py). Returns False when that upload failed and nothing was saved.
+def acquire_uploaded_attachments(uploads, filenames):
+    removed = acquire_attachments(filenames)
+    if removed and not upload_attachments(uploads, removed):
+        # Nothing was saved, so the files uploaded before are unused too
+        remove_attachments(list(uploads))
+        return False
+    return True
+
+# The request's changes are rolled back first, so the commit that queues the files never saves a
+# half-finished add or edit
+def remove_attachments(filenames):
+    db.session.rollback()
+    if filenames:
+        enqueue_file_deletions(filenames)
+        db.session.commit()
+        file_deleter.trigger()
 
 @app.post("/admin/add")
 @login_required
 def add_project_post():
     mode = "Adding a New Project"
     form = ProjectForm()
-    if form.validate_on_submit():
+    uploads = {}
+    chunked_tokens = get_chunked_uploads(form)
+    if chunked_tokens is not None and form.validate_on_submit():
         try:
             # Check for file uploads
             if form.publication_proof.data:
-                publication_proof_filename = get_filename(form.publication_proof.data.filename)
-                upload_file(publication_proof_filename, form.publication_proof.data)
+                publication_proof_filename = add_upload(uploads, form.publication_proof.data)
             else:
                 publication_proof_filename = "none.png"
             
             if form.utilization_proof.data:
-                utilization_proof_filename = get_filename(form.utilization_proof.data.filename)
-                upload_file(utilization_proof_filename, form.utilization_proof.data)
+                utilization_proof_filename = add_upload(uploads, form.utilization_proof.data)
             else:
                 utilization_proof_filename = "none.png"
             
             if form.pdf.data:
-                pdf_filename = get_filename(form.pdf.data.filename)
-                upload_file(pdf_filename, form.pdf.data)
+                pdf_filename = add_upload(uploads, form.pdf.data)
             else:
                 pdf_filename = "none.pdf"
+
+            if not upload_attachments(uploads):
+                return render_template("projectform.html", form=form, mode=mode)
                 
             # Make new project instance
             new_project = Project(
@@ -367,77 +553,76 @@ def add_project_post():
                 pdf=pdf_filename
             )
             db.session.add(new_project)
-            db.session.commit()
+            db.session.flush()
+            if not acquire_uploaded_attachments(uploads, [publication_proof_filename, utilization_proof_filename, pdf_filename]):
+                return render_template("projectform.html", form=form, mode=mode)
             
             # Add author and editor relationships
-            authors_data = form.authors.data.split(', ')
-            for author_name in authors_data:
-                author = Author.query.filter_by(name=author_name).first()
-                if not author:
-                    author = Author(name=author_name)
-                    db.session.add(author)
-                    db.session.commit()
-                author_project = AuthorProject(author_id=author.id, project_id=new_project.id)
-                db.session.add(author_project)
-                
-            editors_data = form.editors.data.split(', ')
-            for editor_name in editors_data:
-                editor = Editor.query.filter_by(name=editor_name).first()
-                if not editor:
-                    editor = Editor(name=editor_name)
-                    db.session.add(editor)
-                    db.session.commit()
-                editor_project = EditorProject(editor_id=editor.id, project_id=new_project.id)
-                db.session.add(editor_project)
+            authors_data = split_names(form.authors.data)
+            editors_data = split_names(form.editors.data)
+            add_author_links(new_project.id, authors_data)
+            add_editor_links(new_project.id, editors_data)
             
+            index_project(new_project, authors_data, editors_data)
             db.session.commit()
+            report_cache.invalidate([new_project.date_published], authors_data)
+            remove_chunked_uploads(chunked_tokens)
         
             flash('Project created successfully.', 'success')
             return redirect(url_for('admin'))
         except Exception as e:
             db.session.rollback()
+            remove_attachments(uploads)
             flash(f'An error occurred: {str(e)}. Please contact the admin or developers if this persists.', 'danger')
     else:
         flash('Project creation failed, please try again.', 'danger')
     return render_template("projectform.html", form=form, mode=mode)
 
+# Admin: Importing Projects
+# ----------------------------------------------------------------------------------------------
+@app.get("/admin/import")
+@login_required
+def import_project_file():
+    form = ImportForm()
+    return render_template("import.html", form=form)
+
+@app.post("/admin/import")
+@login_required
+def import_project_file_post():
+    form = ImportForm()
+    result = None
+    if form.validate_on_submit():
+        try:
+            text = form.file.data.read().decode('utf-8-sig')
+            result = import_projects(text, form.file.data.filename, current_user.id)
+            if result.imported:
+                orphan_sweeper.trigger()
+            flash(f'Imported {result.imported} projects, {len(result.errors)} rows were skipped.',
+                  'success' if not result.errors else 'warning')
+        except UnicodeDecodeError:
+            flash('The file could not be read, please save it as UTF-8 and try again.', 'danger')
+    else:
+        flash('Please choose a CSV or BibTeX file.', 'danger')
+    return render_template("import.html", form=form, result=result)
+
 # Admin: Deleting Projects
 # ----------------------------------------------------------------------------------------------
 @app.get("/admin/delete/")
 @login_required
 def delete_project_list():
-    form = SearchForm()
+    form = get_search_form()
     # Dept. Chair and Admin users may delete any added project
     if current_user.role == 'Chair' or current_user.role == 'Admin':
-        projects = Project.query.all()
+        projects = get_search_page(Project.query, form)
     # Faculty can delete projects they added
     else:
-        projects = Project.query.filter_by(creator_id=current_user.id)
-    return render_template("deleteprojectlist.html", data=projects, mode="Delete", form=form)
+        projects = get_search_page(Project.query.filter_by(creator_id=current_user.id), form)
+    return render_template("deleteprojectlist.html", data=projects, page=projects, mode="Delete", form=form)
 
 @app.post("/admin/delete/")
 @login_required
 def search_delete_projects():
-    form = SearchForm()
-    
-    if current_user.role == 'Chair' or current_user.role == 'Admin':
-        possible_projects = Project.query
-    else:
-        possible_projects = Project.query.filter_by(creator_id=current_user.id)
-    projects = possible_projects
-        
-    if form.title.data:
-        search_term = f"%{form.title.data}%"
-        projects = projects.filter(Project.title.ilike(search_term))
-        
-    if form.author.data:
-        author_search_term = f"%{form.author.data}%"
-        projects = projects.join(AuthorProject).join(Author).filter(Author.name.ilike(author_search_term))
-        
-    if projects.all() == []:
-        flash('This project does not exist. Please check if there are any mistakes.', 'danger')
-        projects = possible_projects
-    return render_template("deleteprojectlist.html", data=projects, mode="Delete", form=form)
+    return delete_project_list()
 
 @app.get("/admin/delete/<int:paper_id>")
 @login_required
@@ -449,16 +634,18 @@ def delete_project(paper_id):
         util_filename = to_delete.utilization_proof
         pdf_filename = to_delete.pdf
         
-        # Delete existing files for project
-        if pub_filename != 'none.png':
-            delete_file(pub_filename)
-        if util_filename != 'none.png':
-            delete_file(util_filename)
-        if pdf_filename != 'none.pdf':
-            delete_file(pdf_filename)
+        # Queue the files no other project uses for deletion from Supabase along with the project
+        release_attachments([pub_filename, util_filename, pdf_filename])
+        
+        date_published = to_delete.date_published
+        authors_data = get_author_names(to_delete.id)
         
+        remove_project(to_delete.id)
         db.session.delete(to_delete)
         db.session.commit()
+        report_cache.invalidate([date_published], authors_data)
+        orphan_sweeper.trigger()
+        file_deleter.trigger()
         flash('Successfully deleted project.', 'success')
     else:
         flash('You do not have permission to delete this project. Contact the project creator, admins or chair to delete this project.', 'danger')
@@ -469,37 +656,19 @@ def delete_project(paper_id):
 @app.get("/admin/edit/")
 @login_required
 def edit_project_list():
-    form = SearchForm()
+    form = get_search_form()
     # Dept. Chair and Admin users can edit all added projects
     if current_user.role == 'Chair' or current_user.role == 'Admin':
-        projects = Project.query.all()
+        projects = get_search_page(Project.query, form)
     # Faculty can access their added projects
     else:
-        projects = Project.query.filter_by(creator_id=current_user.id)
-    return render_template("projectlist.html", data=projects, mode="Edit", form=form)
+        projects = get_search_page(Project.query.filter_by(creator_id=current_user.id), form)
+    return render_template("projectlist.html", data=projects, page=projects, mode="Edit", form=form)
 
 @app.post("/admin/edit/")
 @login_required
 def search_edit_projects():
-    form = SearchForm()
-    if current_user.role == 'Chair' or current_user.role == 'Admin':
-        possible_projects = Project.query
-    else:
-        possible_projects = Project.query.filter_by(creator_id=current_user.id)
-    projects = possible_projects
-        
-    if form.title.data:
-        search_term = f"%{form.title.data}%"
-        projects = projects.filter(Project.title.ilike(search_term))
-    
-    if form.author.data:
-        author_search_term = f"%{form.author.data}%"
-        projects = projects.join(AuthorProject).join(Author).filter(Author.name.ilike(author_search_term))
-        
-    if projects.all() == []:
-        flash('This project does not exist. Please check if there are any mistakes.', 'danger')
-        projects = possible_projects
-    return render_template("projectlist.html", data=projects, mode="Edit", form=form)
+    return edit_project_list()
 
 @app.get("/admin/edit/<int:paper_id>")
 @login_required
@@ -527,8 +696,13 @@ def edit_project_post(paper_id):
     mode = "Editing " + project.title
     form = ProjectForm()
     
-    if form.validate_on_submit():
+    uploads = {}
+    chunked_tokens = get_chunked_uploads(form)
+    if chunked_tokens is not None and form.validate_on_submit():
         try:
+            # Remember what the cached reports saw before the edit
+            old_date_published = project.date_published
+
             project.title = form.title.data
             project.abstract = form.abstract.data or "No abstract provided"
             project.type = form.type.data
@@ -549,81 +723,75 @@ def edit_project_post(paper_id):
             project.citations = form.citations.data
 
             # Handle publication proof
+            old_files = []
+            new_files = []
             if form.clear_publication_proof.data:
                 pub_filename = project.publication_proof
                 if pub_filename != 'none.png':
-                    delete_file(pub_filename)  # Delete from Supabase
+                    old_files.append(pub_filename)
                     project.publication_proof = "none.png"
             elif form.publication_proof.data:
                 pub_filename = project.publication_proof
                 if pub_filename != 'none.png':
-                    delete_file(pub_filename)  # Delete from Supabase
-                publication_proof_filename = get_filename(form.publication_proof.data.filename)
-                upload_file(publication_proof_filename, form.publication_proof.data)
+                    old_files.append(pub_filename)
+                publication_proof_filename = add_upload(uploads, form.publication_proof.data)
+                new_files.append(publication_proof_filename)
                 project.publication_proof = publication_proof_filename
 
             # Handle utilization proof
             if form.clear_utilization_proof.data:
                 util_filename = project.utilization_proof
                 if util_filename != 'none.png':
-                    delete_file(util_filename)  # Delete from Supabase
+                    old_files.append(util_filename)
                     project.utilization_proof = "none.png"
             elif form.utilization_proof.data:
                 util_filename = project.utilization_proof
                 if util_filename != 'none.png':
-                    delete_file(util_filename)  # Delete from Supabase
-                utilization_proof_filename = get_filename(form.utilization_proof.data.filename)
-                upload_file(utilization_proof_filename, form.utilization_proof.data)
+                    old_files.append(util_filename)
+                utilization_proof_filename = add_upload(uploads, form.utilization_proof.data)
+                new_files.append(utilization_proof_filename)
                 project.utilization_proof = utilization_proof_filename
 
             # Handle PDF
             if form.clear_pdf.data:
                 pdf_filename = project.pdf
                 if pdf_filename != 'none.pdf':
-                    delete_file(pdf_filename)  # Delete from Supabase
+                    old_files.append(pdf_filename)
                     project.pdf = "none.pdf"
             elif form.pdf.data:
                 pdf_filename = project.pdf
                 if pdf_filename != 'none.pdf':
-                    delete_file(pdf_filename)  # Delete from Supabase
-                pdf_filename = get_filename(form.pdf.data.filename)
-                upload_file(pdf_filename, form.pdf.data)
+                    old_files.append(pdf_filename)
+                pdf_filename = add_upload(uploads, form.pdf.data)
+                new_files.append(pdf_filename)
                 project.pdf = pdf_filename
 
-            # Clear existing author and editor relationships
-            AuthorProject.query.filter_by(project_id=project.id).delete()
-            EditorProject.query.filter_by(project_id=project.id).delete()
-            db.session.commit()
+            # Upload the new files before saving, the replaced ones are only queued for deletion with the edit
+            if not upload_attachments(uploads):
+                return render_template("projectform.html", mode=mode, form=form)
+
+            # Queue replaced files no other project uses for deletion from Supabase along with the edit
+            if not acquire_uploaded_attachments(uploads, new_files):
+                return render_template("projectform.html", mode=mode, form=form)
+            release_attachments(old_files)
 
-            # Add new authors
-            project.authors.clear()
-            authors_data = form.authors.data.split(', ')
-            for author_name in authors_data:
-                author = Author.query.filter_by(name=author_name).first()
-                if not author:
-                    author = Author(name=author_name)
-                    db.session.add(author)
-                    db.session.commit()
-                author_project = AuthorProject(author_id=author.id, project_id=project.id)
-                db.session.add(author_project)
-
-            # Add new editors
-            project.editors.clear()
-            editors_data = form.editors.data.split(', ')
-            for editor_name in editors_data:
-                editor = Editor.query.filter_by(name=editor_name).first()
-                if not editor:
-                    editor = Editor(name=editor_name)
-                    db.session.add(editor)
-                    db.session.commit()
-                editor_project = EditorProject(editor_id=editor.id, project_id=project.id)
-                db.session.add(editor_project)
+            # Update only the author and editor relationships that changed
+            authors_data = split_names(form.authors.data)
+            editors_data = split_names(form.editors.data)
+            old_authors_data = sync_author_links(project.id, authors_data)
+            sync_editor_links(project.id, editors_data)
 
+            index_project(project, authors_data, editors_data)
             db.session.commit()
+            report_cache.invalidate([old_date_published, project.date_published], old_authors_data + authors_data)
+            remove_chunked_uploads(chunked_tokens)
+            orphan_sweeper.trigger()
+            file_deleter.trigger()
             flash('Project updated successfully.', 'success')
             return redirect(url_for('admin'))
         except Exception as e:
             db.session.rollback()
+            remove_attachments(uploads)
             flash(f'An error occurred: {str(e)}. Please contact the admin or developers if this persists.', 'danger')
 
     return render_template("projectform.html", mode=mode, form=form)
\ No newline at end of file
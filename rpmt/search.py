@@ -0,0 +1,245 @@
+from rpmt import app, db
+from rpmt.models import Project, Author, Editor, AuthorProject, EditorProject
+from sqlalchemy import text, select, insert, func, table, column, literal, false, Integer, Float
+import re
+
+# Project Search Index
+# ----------------------------------------------------------------------------------------------
+# Inverted index over project titles, abstracts, author names and editor names.
+# SQLite uses an FTS5 virtual table keyed by the project id (rowid).
+# Postgres uses a side table with generated tsvector columns behind GIN indexes.
+# Any other database falls back to the old ILIKE filters in search_matches.
+index_ready = False
+
+def get_dialect():
+    return db.engine.dialect.name
+
+# Checks for the index table inside the caller's session, which only reads
+def index_exists():
+    global index_ready
+    if not index_ready:
+        dialect = get_dialect()
+        if dialect == 'sqlite':
+            index_ready = db.session.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'project_search'"
+            )).first() is not None
+        elif dialect == 'postgresql':
+            index_ready = db.session.execute(text("SELECT to_regclass('project_search')")).scalar() is not None
+        else:
+            index_ready = True
+    return index_ready
+
+# Creates and fills the index on first use. The DDL runs on its own connection, never inside the
+# caller's session, so it can't commit half of a request's changes. Requests set it up before the
+# view runs (see prepare_search_index), scripts should call it before they start writing.
+def ensure_search_index():
+    global index_ready
+    if index_exists():
+        return
+    dialect = get_dialect()
+    with db.engine.begin() as connection:
+        if dialect == 'sqlite':
+            created = not connection.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'project_search'"
+            )).first()
+            if created:
+                connection.execute(text(
+                    "CREATE VIRTUAL TABLE project_search USING fts5(title, abstract, authors, editors)"
+                ))
+        else:
+            created = not connection.execute(text("SELECT to_regclass('project_search')")).scalar()
+            if created:
+                connection.execute(text("""
+                    CREATE TABLE project_search (
+                        project_id INTEGER PRIMARY KEY REFERENCES project (id) ON DELETE CASCADE,
+                        title TEXT NOT NULL DEFAULT '',
+                        abstract TEXT NOT NULL DEFAULT '',
+                        authors TEXT NOT NULL DEFAULT '',
+                        editors TEXT NOT NULL DEFAULT '',
+                        text_document TSVECTOR GENERATED ALWAYS AS (
+                            setweight(to_tsvector('english', title), 'A') ||
+                            setweight(to_tsvector('english', abstract), 'B')
+                        ) STORED,
+                        name_document TSVECTOR GENERATED ALWAYS AS (
+                            setweight(to_tsvector('simple', authors), 'A') ||
+                            setweight(to_tsvector('simple', editors), 'B')
+                        ) STORED
+                    )
+                """))
+                connection.execute(text(
+                    "CREATE INDEX ix_project_search_text ON project_search USING GIN (text_document)"
+                ))
+                connection.execute(text(
+                    "CREATE INDEX ix_project_search_name ON project_search USING GIN (name_document)"
+                ))
+        if created:
+            fill_search_index(connection)
+    index_ready = True
+
+@app.before_request
+def prepare_search_index():
+    try:
+        ensure_search_index()
+    except Exception as e:
+        # Pages that don't search still work, the next request tries again
+        print(f"Error creating the search index: {str(e)}")
+
+# Function to index every project in one INSERT ... SELECT on the given connection
+def fill_search_index(connection):
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        join_names = lambda column: func.coalesce(func.group_concat(column, ', '), '')
+    else:
+        join_names = lambda column: func.coalesce(func.string_agg(column, ', '), '')
+    author_names = select(join_names(Author.name)) \
+                         .join(AuthorProject, AuthorProject.author_id == Author.id) \
+                         .where(AuthorProject.project_id == Project.id) \
+                         .scalar_subquery()
+    editor_names = select(join_names(Editor.name)) \
+                         .join(EditorProject, EditorProject.editor_id == Editor.id) \
+                         .where(EditorProject.project_id == Project.id) \
+                         .scalar_subquery()
+    id_column = "rowid" if dialect == 'sqlite' else "project_id"
+    search_table = table("project_search", column(id_column), column("title"), column("abstract"),
+                         column("authors"), column("editors"))
+    connection.execute(insert(search_table).from_select(
+        [id_column, "title", "abstract", "authors", "editors"],
+        select(Project.id, func.coalesce(Project.title, ''), func.coalesce(Project.abstract, ''),
+               author_names, editor_names)
+    ))
+
+def write_index_row(project_id, title, abstract, authors, editors):
+    params = {
+        "project_id": project_id,
+        "title": title or "",
+        "abstract": abstract or "",
+        "authors": ', '.join(authors),
+        "editors": ', '.join(editors)
+    }
+    if get_dialect() == 'sqlite':
+        db.session.execute(text("DELETE FROM project_search WHERE rowid = :project_id"), params)
+        db.session.execute(text(
+            "INSERT INTO project_search (rowid, title, abstract, authors, editors) "
+            "VALUES (:project_id, :title, :abstract, :authors, :editors)"
+        ), params)
+    else:
+        db.session.execute(text(
+            "INSERT INTO project_search (project_id, title, abstract, authors, editors) "
+            "VALUES (:project_id, :title, :abstract, :authors, :editors) "
+            "ON CONFLICT (project_id) DO UPDATE SET title = EXCLUDED.title, abstract = EXCLUDED.abstract, "
+            "authors = EXCLUDED.authors, editors = EXCLUDED.editors"
+        ), params)
+
+# Index (or re-index) a project inside the caller's transaction. Without an index table there is
+# nothing to update, it is filled from the committed projects once it is created.
+def index_project(project, author_names, editor_names):
+    if get_dialect() not in ('sqlite', 'postgresql') or not index_exists():
+        return
+    write_index_row(project.id, project.title, project.abstract, author_names, editor_names)
+
+# Index new projects given as (id, title, abstract, author names, editor names) in one statement
+def index_new_projects(projects):
+    if get_dialect() not in ('sqlite', 'postgresql') or not projects or not index_exists():
+        return
+    id_column = "rowid" if get_dialect() == 'sqlite' else "project_id"
+    db.session.execute(text(
+        f"INSERT INTO project_search ({id_column}, title, abstract, authors, editors) "
+        "VALUES (:project_id, :title, :abstract, :authors, :editors)"
+    ), [{
+        "project_id": project_id,
+        "title": title or "",
+        "abstract": abstract or "",
+        "authors": ', '.join(authors),
+        "editors": ', '.join(editors)
+    } for project_id, title, abstract, authors, editors in projects])
+
+def remove_project(project_id):
+    if not index_exists():
+        return
+    dialect = get_dialect()
+    if dialect == 'sqlite':
+        db.session.execute(text("DELETE FROM project_search WHERE rowid = :project_id"), {"project_id": project_id})
+    elif dialect == 'postgresql':
+        db.session.execute(text("DELETE FROM project_search WHERE project_id = :project_id"), {"project_id": project_id})
+
+def rebuild_search_index():
+    ensure_search_index()
+    if get_dialect() not in ('sqlite', 'postgresql'):
+        return 0
+    with db.engine.begin() as connection:
+        connection.execute(text("DELETE FROM project_search"))
+        fill_search_index(connection)
+    return db.session.query(Project).count()
+
+# Search Queries
+# ----------------------------------------------------------------------------------------------
+def get_terms(search_term):
+    return re.findall(r"\w+", (search_term or "").lower())
+
+def fts5_match(columns, terms):
+    phrases = ' AND '.join(f'"{term}"*' for term in terms)
+    return f"{{{columns}}} : ({phrases})"
+
+def tsquery(terms):
+    return ' & '.join(f"{term}:*" for term in terms)
+
+# Returns a (project_id, rank) subquery of the projects matching the title/abstract and author/editor
+# terms, lower ranks are better matches, or None when there is nothing to search for. Callers join
+# it to their own project query so filters like the creator apply before any paging.
+def search_matches(title=None, author=None):
+    ensure_search_index()
+    title_terms = get_terms(title)
+    author_terms = get_terms(author)
+    if not title_terms and not author_terms:
+        return None
+
+    dialect = get_dialect()
+    if dialect == 'sqlite':
+        matches = []
+        if title_terms:
+            matches.append(fts5_match("title abstract", title_terms))
+        if author_terms:
+            matches.append(fts5_match("authors editors", author_terms))
+        return text(
+            "SELECT rowid AS project_id, bm25(project_search, 10.0, 1.0, 5.0, 1.0) AS rank "
+            "FROM project_search WHERE project_search MATCH :match"
+        ).bindparams(match=' AND '.join(f"({match})" for match in matches)) \
+         .columns(project_id=Integer, rank=Float).subquery("search_matches")
+
+    if dialect == 'postgresql':
+        conditions = []
+        ranks = []
+        params = {}
+        if title_terms:
+            conditions.append("text_document @@ to_tsquery('english', :title_query)")
+            ranks.append("ts_rank(text_document, to_tsquery('english', :title_query))")
+            params["title_query"] = tsquery(title_terms)
+        if author_terms:
+            conditions.append("name_document @@ to_tsquery('simple', :author_query)")
+            ranks.append("ts_rank(name_document, to_tsquery('simple', :author_query))")
+            params["author_query"] = tsquery(author_terms)
+        return text(
+            f"SELECT project_id, -({' + '.join(ranks)}) AS rank "
+            f"FROM project_search WHERE {' AND '.join(conditions)}"
+        ).bindparams(**params).columns(project_id=Integer, rank=Float).subquery("search_matches")
+
+    # No full-text support, fall back to substring matching
+    projects = select(Project.id.label("project_id"), literal(0).label("rank"))
+    if title:
+        projects = projects.where(Project.title.ilike(f"%{title}%"))
+    if author:
+        projects = projects.join(AuthorProject).join(Author).where(Author.name.ilike(f"%{author}%"))
+    return projects.distinct().subquery("search_matches")
+
+# Narrows a project query down to the matches, returns the query and the rank column to order it by
+# (best match first), see paginate_search
+def search_projects_query(projects, title=None, author=None):
+    matches = search_matches(title, author)
+    if matches is None:
+        return projects.filter(false()), literal(0)
+    return projects.join(matches, matches.c.project_id == Project.id), matches.c.rank
+
+@app.cli.command("rebuild-search-index")
+def rebuild_search_index_command():
+    count = rebuild_search_index()
+    print(f"Indexed {count} projects.")
@@ -0,0 +1,118 @@
+from rpmt import app, db, DB_POOL_SIZE, DB_MAX_OVERFLOW
+from rpmt.tasks import orphan_sweeper, file_deleter
+from waitress import create_server
+import webbrowser
+import threading
+import signal
+import socket
+import time
+import os
+
+# Server
+# ----------------------------------------------------------------------------------------------
+# app.py serves RPMT with waitress, configured from the environment. The defaults suit the desktop
+# app (RPMT.exe), a server with many users wants more SERVER_THREADS since a thread is held for the
+# whole of a slow storage call. SERVER_WORKERS above 1 forks that many processes sharing one listening
+# socket to use several cores (Linux/macOS only, Windows always runs one process).
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", 8080))
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", 8))
+SERVER_CONNECTION_LIMIT = int(os.getenv("SERVER_CONNECTION_LIMIT", 100))
+SERVER_CHANNEL_TIMEOUT = int(os.getenv("SERVER_CHANNEL_TIMEOUT", 120))
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", 1024))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", 1))
+OPEN_BROWSER = os.getenv("OPEN_BROWSER", "1").lower() not in ("0", "false", "no")
+# Seconds to wait before replacing a worker that exited, so a crashing worker doesn't spin
+WORKER_RESTART_DELAY = 1
+
+def open_browser():
+    webbrowser.open_new(f'http://127.0.0.1:{SERVER_PORT}')
+
+def make_server(sockets=None):
+    options = {
+        "threads": SERVER_THREADS,
+        "connection_limit": SERVER_CONNECTION_LIMIT,
+        "channel_timeout": SERVER_CHANNEL_TIMEOUT,
+        "backlog": SERVER_BACKLOG
+    }
+    if sockets:
+        return create_server(app, sockets=sockets, **options)
+    return create_server(app, host=SERVER_HOST, port=SERVER_PORT, **options)
+
+def start_background_tasks():
+    orphan_sweeper.start()  # Remove authors/editors without projects in the background
+    file_deleter.start()  # Remove deleted attachments from storage in the background
+
+# Prefork Workers
+# ----------------------------------------------------------------------------------------------
+def run_worker(sock, index):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # Pooled connections can't be shared between processes, drop any copied from the parent
+    with app.app_context():
+        db.engine.dispose(close=False)
+    # One worker runs the background tasks, work queued by the others waits for its next interval
+    if index == 0:
+        start_background_tasks()
+    make_server([sock]).run()
+
+# Forks the workers and replaces any that exit until the launcher gets SIGTERM or Ctrl+C
+def serve_workers(workers):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((SERVER_HOST, SERVER_PORT))
+    sock.listen(SERVER_BACKLOG)
+    sock.setblocking(False)
+
+    children = {}
+    stopping = False
+
+    def spawn(index):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(sock, index)
+            finally:
+                os._exit(0)
+        children[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for index in range(workers):
+        spawn(index)
+    print(f"Serving on http://{SERVER_HOST}:{SERVER_PORT} with {workers} workers")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is not None and not stopping:
+            print(f"Worker {pid} exited with status {status}, starting a new one")
+            time.sleep(WORKER_RESTART_DELAY)
+            spawn(index)
+
+def serve():
+    if SERVER_THREADS > DB_POOL_SIZE + DB_MAX_OVERFLOW:
+        print(f"Warning: SERVER_THREADS ({SERVER_THREADS}) is more than DB_POOL_SIZE + DB_MAX_OVERFLOW "
+              f"({DB_POOL_SIZE + DB_MAX_OVERFLOW}), requests will wait for database connections")
+
+    if SERVER_WORKERS > 1 and hasattr(os, "fork"):
+        serve_workers(SERVER_WORKERS)
+        return
+    if SERVER_WORKERS > 1:
+        print("Warning: SERVER_WORKERS needs fork, which this system doesn't have, running one process")
+
+    # Bind the socket first so the browser can be opened as soon as the server accepts connections
+    server = make_server()
+    if OPEN_BROWSER:
+        threading.Thread(target=open_browser, daemon=True).start()
+    start_background_tasks()
+    server.run()
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+import threading
+import time
+import os
+
+# Shared In-Memory Cache
+# ----------------------------------------------------------------------------------------------
+# Base of the user cache and the report cache. Entries are evicted least recently used first or
+# once older than the TTL. Every process on the machine (server workers, delete_user.py,
+# import_projects.py) keeps its own entries. They share a stamp file, and when one process
+# invalidates something it touches the file. The others clear their whole cache on their next
+# lookup, because the file's modification time changed.
+class StampedCache:
+    def __init__(self, stamp_path, max_entries=1024, ttl=300):
+        self.stamp_path = stamp_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stamp = self.read_stamp()
+        self.hits = 0
+        self.misses = 0
+
+    def read_stamp(self):
+        try:
+            return os.stat(self.stamp_path).st_mtime_ns
+        except OSError:
+            return None
+
+    # Called with the lock held, clears the entries if another process touched the stamp
+    def sync_stamp(self, stamp):
+        if stamp != self.stamp:
+            self.entries.clear()
+            self.stamp = stamp
+
+    # Called with the lock held. A change another process made since the last lookup is applied
+    # first, the new stamp would hide it otherwise.
+    def touch_stamp(self):
+        self.sync_stamp(self.read_stamp())
+        try:
+            now = time.time_ns()
+            with open(self.stamp_path, 'a'):
+                os.utime(self.stamp_path, ns=(now, now))
+            self.stamp = self.read_stamp()
+        except OSError as e:
+            print(f"Error updating the cache stamp {self.stamp_path}: {str(e)}")
+
+    def get(self, key):
+        stamp = self.read_stamp()
+        with self.lock:
+            self.sync_stamp(stamp)
+            entry = self.entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    # Drops the keys the predicate matches here and everything in the other processes
+    def invalidate_where(self, predicate):
+        with self.lock:
+            removed = [key for key in self.entries if predicate(key)]
+            for key in removed:
+                del self.entries[key]
+            self.touch_stamp()
+            return len(removed)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.touch_stamp()
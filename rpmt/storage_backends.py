@@ -0,0 +1,160 @@
+from rpmt.file_cache import attachment_cache
+from flask import url_for
+from collections import OrderedDict
+import threading
+import tempfile
+import shutil
+import time
+import os
+
+# Storage Backends
+# ----------------------------------------------------------------------------------------------
+# Attachments go through one of these backends, picked with STORAGE_BACKEND in .env:
+#   supabase: the RPMT bucket on Supabase (default)
+#   local:    a folder on this machine (LOCAL_STORAGE_DIR), for offline installs and benchmarks
+# Every backend provides upload, remove, get_url, exists and local_path.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+class SupabaseStorage:
+    def __init__(self, url, key, bucket='RPMT', signed_url_ttl=0, exists_cache_ttl=60, exists_cache_size=1024):
+        self.url = url
+        self.key = key
+        self.bucket_name = bucket
+        self.signed_url_ttl = signed_url_ttl
+        self.exists_cache_ttl = exists_cache_ttl
+        self.exists_cache_size = exists_cache_size
+        self.exists_cache = OrderedDict()
+        self.exists_lock = threading.Lock()
+        self.client = None
+        self.lock = threading.Lock()
+
+    # The Supabase client is only created the first time storage is actually used
+    @property
+    def bucket(self):
+        if self.client is None:
+            with self.lock:
+                if self.client is None:
+                    from supabase import create_client
+                    self.client = create_client(self.url, self.key)
+        return self.client.storage.from_(self.bucket_name)
+
+    # Uploads overwrite, two projects may upload the same content addressed file at the same time
+    def upload(self, filename, file_content, mime):
+        self.forget(filename)
+        if isinstance(file_content, bytes):
+            self.bucket.upload(filename, file_content, {"content-type": mime, "upsert": "true"})
+            return
+
+        # Spool the upload to disk in chunks so the client streams it instead of holding it in memory
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            shutil.copyfileobj(file_content, temp_file, UPLOAD_CHUNK_SIZE)
+            temp_path = temp_file.name
+        try:
+            with open(temp_path, 'rb') as upload_stream:
+                self.bucket.upload(filename, upload_stream, {"content-type": mime, "upsert": "true"})
+            attachment_cache.store(filename, temp_path)
+        finally:
+            os.remove(temp_path)
+
+    def remove(self, filenames):
+        self.bucket.remove(list(filenames))
+        for filename in filenames:
+            self.forget(filename)
+            attachment_cache.forget(filename)
+
+    def get_url(self, filename):
+        if self.signed_url_ttl:
+            signed = self.bucket.create_signed_url(filename, self.signed_url_ttl)
+            return signed.get('signedURL') or signed.get('signedUrl')
+        return self.bucket.get_public_url(filename)
+
+    # Checks that a file exists with a HEAD request. Files that exist are remembered for a short while,
+    # at most exists_cache_size of them, least recently used first out. Missing files aren't, the
+    # filename comes from the request and anyone could fill the cache with made up ones.
+    def exists(self, filename, url):
+        now = time.monotonic()
+        with self.exists_lock:
+            expires = self.exists_cache.get(filename)
+            if expires is not None and expires > now:
+                self.exists_cache.move_to_end(filename)
+                return True
+            self.exists_cache.pop(filename, None)
+        import requests
+        try:
+            exists = requests.head(url, allow_redirects=True, timeout=10).status_code == 200
+        except requests.RequestException as e:
+            print(f"Error checking file: {str(e)}")
+            return False
+        if exists:
+            self.remember(filename, now + self.exists_cache_ttl)
+        return exists
+
+    def remember(self, filename, expires):
+        with self.exists_lock:
+            self.exists_cache[filename] = expires
+            self.exists_cache.move_to_end(filename)
+            if len(self.exists_cache) > self.exists_cache_size:
+                # Expired entries go first, then the least recently used ones
+                now = time.monotonic()
+                for stale in [name for name, expiry in self.exists_cache.items() if expiry <= now]:
+                    del self.exists_cache[stale]
+                while len(self.exists_cache) > self.exists_cache_size:
+                    self.exists_cache.popitem(last=False)
+
+    def forget(self, filename):
+        with self.exists_lock:
+            self.exists_cache.pop(filename, None)
+
+    def local_path(self, filename):
+        return None
+
+class LocalStorage:
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, filename):
+        path = os.path.abspath(os.path.join(self.directory, filename))
+        if os.path.dirname(path) != self.directory:
+            raise ValueError(f"Invalid filename: {filename}")
+        return path
+
+    # Writes to a temporary file next to the target and renames it into place, so readers never
+    # see a partially written file
+    def upload(self, filename, file_content, mime):
+        with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as temp_file:
+            if isinstance(file_content, bytes):
+                temp_file.write(file_content)
+            else:
+                shutil.copyfileobj(file_content, temp_file, UPLOAD_CHUNK_SIZE)
+        os.replace(temp_file.name, self.path(filename))
+
+    def remove(self, filenames):
+        for filename in filenames:
+            try:
+                os.remove(self.path(filename))
+            except FileNotFoundError:
+                pass
+
+    def get_url(self, filename):
+        return url_for('local_file', filename=filename)
+
+    def exists(self, filename, url=None):
+        return self.local_path(filename) is not None
+
+    def local_path(self, filename):
+        try:
+            path = self.path(filename)
+        except ValueError:
+            return None
+        return path if os.path.isfile(path) else None
+
+def get_storage_backend(name, **options):
+    if name == 'local':
+        return LocalStorage(options['local_directory'])
+    if name == 'supabase':
+        return SupabaseStorage(options['supabase_url'], options['supabase_key'],
+                               signed_url_ttl=options.get('signed_url_ttl', 0),
+                               exists_cache_ttl=options.get('exists_cache_ttl', 60),
+                               exists_cache_size=options.get('exists_cache_size', 1024))
+    raise ValueError(f"Unknown storage backend: {name}")
@@ -0,0 +1,47 @@
+from rpmt import app
+from rpmt.names import delete_orphan_names
+from rpmt.deletions import process_file_deletions
+import threading
+import traceback
+import os
+
+# Background Tasks
+# ----------------------------------------------------------------------------------------------
+# A daemon thread that runs a function inside the app context every `interval` seconds, or sooner
+# when trigger() is called. Nothing runs until start() is called (see app.py), so importing the
+# package or running CLI scripts never spawns threads.
+class PeriodicTask:
+    def __init__(self, name, function, interval):
+        self.name = name
+        self.function = function
+        self.interval = interval
+        self.wake = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.loop, name=self.name, daemon=True)
+            self.thread.start()
+
+    def trigger(self):
+        self.wake.set()
+
+    def run_once(self):
+        with app.app_context():
+            try:
+                return self.function()
+            except Exception as e:
+                print(f"Error running {self.name}: {str(e)}")
+                traceback.print_exc()
+
+    def loop(self):
+        while True:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            self.run_once()
+
+# Removes authors/editors without projects, woken early after project edits and deletions
+orphan_sweeper = PeriodicTask("orphan-sweeper", delete_orphan_names, int(os.getenv("ORPHAN_SWEEP_INTERVAL", 3600)))
+
+# Drains the attachment deletion queue, woken early whenever files are queued
+file_deleter = PeriodicTask("file-deleter", process_file_deletions, int(os.getenv("FILE_DELETE_INTERVAL", 60)))
@@ -0,0 +1,19 @@
+from rpmt.stamped_cache import StampedCache
+import tempfile
+import os
+
+# User Cache
+# ----------------------------------------------------------------------------------------------
+# Flask-Login loads the logged in user on every request. The column values of recently seen users
+# are kept here so a warm page view doesn't touch the user table (see load_user in rpmt/models.py).
+# Changing or deleting a user must call invalidate() after the commit, which also makes every other
+# process on the machine drop its cached users through the USER_CACHE_STAMP file.
+class UserCache(StampedCache):
+    def invalidate(self, user_id):
+        self.invalidate_where(lambda key: key == user_id)
+
+user_cache = UserCache(
+    stamp_path=os.getenv("USER_CACHE_STAMP", os.path.join(tempfile.gettempdir(), "rpmt-user-cache.stamp")),
+    max_entries=int(os.getenv("USER_CACHE_SIZE", 1024)),
+    ttl=int(os.getenv("USER_CACHE_TTL", 300))
+)